@@ -0,0 +1,38 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from users import snapshots
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация, которая берет пользователя из кеша снимков.
+    Снимок используется только для безопасных методов: запросы на запись
+    читают пользователя из базы и заодно обновляют снимок.
+    На кеше, который видит один процесс, снимки выключены.
+    """
+
+    use_snapshot = False
+
+    def authenticate(self, request):
+        self.use_snapshot = (
+            request.method in SAFE_METHODS and snapshots.enabled()
+        )
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        user = None
+        if self.use_snapshot:
+            user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+            user = user_id is not None and snapshots.get(user_id)
+        if not user:
+            user = super().get_user(validated_token)
+            if snapshots.enabled():
+                snapshots.remember(user)
+        elif not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return user
@@ -0,0 +1,111 @@
+"""
+Запись произведений пачкой.
+Жанры пишутся разницей с текущими связями: одна вставка недостающих
+строк genre_title и одно удаление лишних, без построчных запросов
+менеджера M2M. Пачка создается и обновляется в одной транзакции.
+"""
+from collections import defaultdict
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+from reviews.models import Title
+from reviews.signals import bulk_loaded
+
+GenreTitle = Title.genre.through
+
+# Ограничение числа параметров в одном запросе (SQLite: 999).
+CHUNK_SIZE = 500
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def write_genres(genres, created=()):
+    """
+    Приводит связи к genres: {id произведения: id жанров}.
+    Для created (только что созданных) текущие связи не читаются.
+    Возвращает число добавленных и удаленных строк.
+    """
+    using = router.db_for_write(GenreTitle)
+    existing = defaultdict(dict)
+    stored = [title_id for title_id in genres if title_id not in created]
+    for chunk in _chunks(stored):
+        for pk, title_id, genre_id in GenreTitle.objects.using(using).filter(
+            title_id__in=chunk
+        ).values_list('pk', 'title_id', 'genre_id'):
+            existing[title_id][genre_id] = pk
+    added, removed = [], []
+    for title_id, genre_ids in genres.items():
+        current = existing[title_id]
+        wanted = set(genre_ids)
+        added += [
+            GenreTitle(title_id=title_id, genre_id=genre_id)
+            for genre_id in sorted(wanted - set(current))
+        ]
+        removed += [
+            pk for genre_id, pk in current.items() if genre_id not in wanted
+        ]
+    for chunk in _chunks(removed):
+        # Удаление без сбора связанных объектов и построчных сигналов;
+        # кеш сбрасывает сохранение самого произведения.
+        GenreTitle.objects.filter(pk__in=chunk)._raw_delete(using)
+    if added:
+        GenreTitle.objects.using(using).bulk_create(
+            added, batch_size=CHUNK_SIZE
+        )
+    return len(added), len(removed)
+
+
+def _create(titles, using):
+    if connections[using].features.can_return_ids_from_bulk_insert:
+        return Title.objects.using(using).bulk_create(
+            titles, batch_size=CHUNK_SIZE
+        )
+    # Без RETURNING id новых строк неизвестны: пишем по одной.
+    for title in titles:
+        title.save(using=using)
+    return titles
+
+
+def save_titles(changes):
+    """
+    Создает и обновляет произведения одной транзакцией.
+    changes - пары (произведение или None, проверенные данные
+    TitleWriteSerializer). Возвращает id созданных и обновленных
+    в порядке changes.
+    """
+    using = router.db_for_write(Title)
+    now = timezone.now()
+    created, updated, fields, genres = [], [], set(), {}
+    with transaction.atomic(using=using):
+        for instance, data in changes:
+            data = dict(data)
+            genre = data.pop('genre', None)
+            if instance is None:
+                instance = Title(**data)
+                created.append((instance, genre))
+                continue
+            for name, value in data.items():
+                setattr(instance, name, value)
+            instance.updated_at = now
+            fields.update(data)
+            updated.append(instance)
+            if genre is not None:
+                genres[instance.pk] = [obj.pk for obj in genre]
+        _create([title for title, _ in created], using)
+        for title, genre in created:
+            genres[title.pk] = [obj.pk for obj in genre or ()]
+        if updated:
+            Title.objects.using(using).bulk_update(
+                updated, sorted(fields | {'updated_at'}),
+                batch_size=CHUNK_SIZE
+            )
+        write_genres(genres, created={title.pk for title, _ in created})
+    bulk_loaded.send(sender=Title, models=[Title, GenreTitle])
+    return (
+        [title.pk for title, _ in created],
+        [title.pk for title in updated],
+    )
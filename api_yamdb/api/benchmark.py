@@ -0,0 +1,418 @@
+"""
+Нагрузочный прогон эндпоинтов API на синтетических данных.
+Данные создаются внутри транзакции и откатываются после замеров.
+"""
+import math
+import random
+import time
+from datetime import timedelta
+from functools import partial
+
+from django.db import connections, transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.bulk import reset_sequences, write_objects
+from reviews.models import Category, Comment, Genre, Review, Title
+from users import codes, snapshots
+from users.models import ADMIN, User
+
+from .cache import NAMESPACES, bump_version
+from .catalog import CATALOGS
+from .fast_read import build_titles, title_columns
+from .serializers import TitleReadSerializer
+
+ROUTES = (
+    ('titles-list', '/api/v1/titles/'),
+    ('titles-filter', '/api/v1/titles/?genre={genre}&ordering=-rating'),
+    ('titles-detail', '/api/v1/titles/{title_id}/'),
+    ('categories-list', '/api/v1/categories/'),
+    ('genres-list', '/api/v1/genres/'),
+    ('reviews-list', '/api/v1/titles/{title_id}/reviews/'),
+    ('reviews-detail', '/api/v1/titles/{title_id}/reviews/{review_id}/'),
+    (
+        'comments-list',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    ),
+    (
+        'comments-detail',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/'
+    ),
+    ('users-list', '/api/v1/users/'),
+    ('users-detail', '/api/v1/users/{username}/'),
+    ('users-me', '/api/v1/users/me/'),
+    ('auth-signup', '/api/v1/auth/signup/'),
+    ('auth-token', '/api/v1/auth/token/'),
+    ('reviews-create', '/api/v1/titles/{title_id}/reviews/'),
+    (
+        'comments-create',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    ),
+    ('titles-batch', '/api/v1/titles/batch/'),
+)
+
+# Маршруты, недоступные без токена.
+AUTH_ROUTES = (
+    'users-list', 'users-detail', 'users-me', 'reviews-create',
+    'comments-create', 'titles-batch',
+)
+
+# Маршруты, которые всегда вызываются без токена.
+ANONYMOUS_ROUTES = ('auth-signup', 'auth-token')
+
+# Размер пачки titles-batch: сколько произведений создать и обновить.
+BATCH_CREATES = 5
+BATCH_UPDATES = 5
+
+# Имена пользователей, которых создают auth-signup и auth-token.
+SIGNUP_USERNAME = 'bench_signup_{}'
+TOKEN_USERNAME = 'bench_token_{}'
+
+# Метрики, рост которых считается регрессией.
+COMPARED = ('p50_ms', 'p90_ms', 'queries')
+
+
+def _next_id(model):
+    last = model.objects.order_by('-pk').values_list('pk', flat=True).first()
+    return (last or 0) + 1
+
+
+def seed_dataset(titles=100, genres=10, categories=5, users=50,
+                 reviews_per_title=5, comments_per_review=2, seed=1,
+                 using='default'):
+    """
+    Наполняет базу воспроизводимым набором данных.
+    Возвращает подстановки для шаблонов ROUTES и администратора.
+    """
+    rng = random.Random(seed)
+    reviews_per_title = min(reviews_per_title, users)
+    now = timezone.now()
+
+    category_objs = [
+        Category(id=_next_id(Category) + i, name=f'Категория {i}',
+                 slug=f'bench-category-{seed}-{i}')
+        for i in range(categories)
+    ]
+    genre_objs = [
+        Genre(id=_next_id(Genre) + i, name=f'Жанр {i}',
+              slug=f'bench-genre-{seed}-{i}')
+        for i in range(genres)
+    ]
+    user_objs = [
+        User(id=_next_id(User) + i, username=f'bench{seed}_{i}',
+             email=f'bench{seed}_{i}@yamdb.fake', password='!',
+             role=ADMIN if i == 0 else 'user', date_joined=now)
+        for i in range(users)
+    ]
+    title_objs = [
+        Title(id=_next_id(Title) + i, name=f'Произведение {i}',
+              year=rng.randint(1950, 2022),
+              description=f'Описание произведения {i}',
+              category_id=rng.choice(category_objs).id)
+        for i in range(titles)
+    ]
+    through = Title.genre.through
+    genre_links = [
+        through(title_id=title.id, genre_id=genre.id)
+        for title in title_objs
+        for genre in rng.sample(genre_objs, rng.randint(1, min(3, genres)))
+    ]
+    review_id = _next_id(Review)
+    review_objs = []
+    for title in title_objs:
+        for author in rng.sample(user_objs, reviews_per_title):
+            review_objs.append(Review(
+                id=review_id, title_id=title.id, author_id=author.id,
+                text=f'Отзыв {review_id}', score=rng.randint(1, 10),
+                pub_date=now - timedelta(minutes=rng.randint(0, 10 ** 5)),
+            ))
+            review_id += 1
+    comment_id = _next_id(Comment)
+    comment_objs = []
+    for review in review_objs:
+        for _ in range(comments_per_review):
+            comment_objs.append(Comment(
+                id=comment_id, review_id=review.id,
+                author_id=rng.choice(user_objs).id,
+                text=f'Комментарий {comment_id}',
+                pub_date=review.pub_date + timedelta(minutes=1),
+            ))
+            comment_id += 1
+
+    models = (Category, Genre, User, Title, through, Review, Comment)
+    for model, objs in zip(models, (
+        category_objs, genre_objs, user_objs, title_objs, genre_links,
+        review_objs, comment_objs,
+    )):
+        write_objects(model, objs, using)
+    reset_sequences([Category, Genre, User, Title, Review, Comment], using)
+    Title.objects.using(using).filter(
+        pk__in=[title.id for title in title_objs]
+    ).recalculate_rating()
+
+    title = title_objs[0]
+    review = next(r for r in review_objs if r.title_id == title.id)
+    comment = next(
+        (c for c in comment_objs if c.review_id == review.id), None
+    )
+    return user_objs[0], {
+        'title_id': title.id,
+        'review_id': review.id,
+        'comment_id': comment.id if comment else 0,
+        'genre': genre_objs[0].slug,
+        'category': category_objs[0].slug,
+        'username': user_objs[-1].username,
+        'title_ids': [title.id for title in title_objs[:BATCH_UPDATES]],
+    }
+
+
+def _signup(template, context, using):
+    url = template.format(**context)
+
+    def prepare(index):
+        username = SIGNUP_USERNAME.format(index)
+        return url, {'username': username, 'email': f'{username}@yamdb.fake'}
+    return prepare
+
+
+def _token(template, context, using):
+    url = template.format(**context)
+
+    def prepare(index):
+        username = TOKEN_USERNAME.format(index)
+        code = codes.issue(User(
+            username=username, email=f'{username}@yamdb.fake'
+        ))
+        return url, {'username': username, 'confirmation_code': code}
+    return prepare
+
+
+def _review(template, context, using):
+    def prepare(index):
+        # Автор пишет один отзыв на произведение - каждому свое.
+        title = Title.objects.using(using).create(
+            name=f'Для отзыва {index}', year=2000
+        )
+        return template.format(**dict(context, title_id=title.pk)), {
+            'text': f'Отзыв {index}', 'score': index % 10 + 1,
+        }
+    return prepare
+
+
+def _comment(template, context, using):
+    url = template.format(**context)
+
+    def prepare(index):
+        return url, {'text': f'Комментарий {index}'}
+    return prepare
+
+
+def _batch(template, context, using):
+    url = template.format(**context)
+
+    def prepare(index):
+        items = [
+            {'name': f'Пачка {index}-{i}', 'year': 2000,
+             'category': context['category'], 'genre': [context['genre']]}
+            for i in range(BATCH_CREATES)
+        ]
+        items += [
+            {'id': pk, 'description': f'Правка {index}'}
+            for pk in context['title_ids']
+        ]
+        return url, items
+    return prepare
+
+
+# Подготовка маршрутов на запись: (шаблон, подстановки, база) ->
+# prepare(номер запроса) -> (url, тело). Данные у каждого запроса свои,
+# чтобы повторы не упирались в уникальные ключи.
+WRITES = {
+    'auth-signup': _signup,
+    'auth-token': _token,
+    'reviews-create': _review,
+    'comments-create': _comment,
+    'titles-batch': _batch,
+}
+
+
+def reset_caches():
+    """Сбрасывает кеш ответов и справочники после вставки или отката."""
+    bump_version(*NAMESPACES)
+    for catalog in CATALOGS.values():
+        catalog.bump()
+
+
+def percentile(values, share):
+    """
+    Процентиль по методу ближайшего ранга: наименьшее значение,
+    не меньше которого доля share всех значений.
+    """
+    ordered = sorted(values)
+    index = max(0, math.ceil(share * len(ordered)) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def measure(client, url, requests, warmup, using='default', prepare=None):
+    """
+    Замеряет один маршрут: задержки, пропускную способность, запросы.
+    Без prepare маршрут читается GET по url. С ним - POST: prepare
+    готовит url и тело каждого запроса, и его запросы не считаются.
+    """
+    def build(index):
+        if prepare is None:
+            return partial(client.get, url)
+        path, data = prepare(index)
+        return partial(client.post, path, data, format='json')
+
+    for index in range(warmup):
+        build(index)()
+    queries = []
+    counting = [False]
+
+    def count(execute, sql, params, many, context):
+        if counting[0]:
+            queries[-1] += 1
+        return execute(sql, params, many, context)
+
+    latencies = []
+    statuses = set()
+    with connections[using].execute_wrapper(count):
+        for index in range(warmup, warmup + requests):
+            send = build(index)
+            queries.append(0)
+            counting[0] = True
+            started = time.perf_counter()
+            response = send()
+            latencies.append(time.perf_counter() - started)
+            counting[0] = False
+            statuses.add(response.status_code)
+    elapsed = sum(latencies)
+    return {
+        'url': url,
+        'requests': requests,
+        'status': sorted(statuses),
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+        'p90_ms': round(percentile(latencies, 0.9) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(sum(latencies) / requests * 1000, 3),
+        'rps': round(requests / elapsed, 1),
+        'queries': max(queries),
+    }
+
+
+def run(routes=None, requests=50, warmup=5, anonymous=False,
+        using='default', **dataset):
+    """
+    Создает данные, прогоняет маршруты и откатывает изменения.
+    Анонимный прогон идет через кеш ответов, с токеном - мимо него.
+    Возвращает словарь {имя маршрута: метрики}.
+    """
+    results = {}
+    admin = None
+    with transaction.atomic(using=using):
+        try:
+            admin, context = seed_dataset(using=using, **dataset)
+            reset_caches()
+            guest = client = APIClient()
+            if not anonymous:
+                client = APIClient()
+                client.credentials(
+                    HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}'
+                )
+            for name, template in ROUTES:
+                if routes and name not in routes or (
+                    anonymous and name in AUTH_ROUTES
+                ):
+                    continue
+                prepare = None
+                if name in WRITES:
+                    prepare = WRITES[name](template, context, using)
+                results[name] = measure(
+                    guest if name in ANONYMOUS_ROUTES else client,
+                    template.format(**context), requests, warmup, using,
+                    prepare
+                )
+        finally:
+            transaction.set_rollback(True, using=using)
+            if admin is not None:
+                snapshots.forget(admin.pk)
+            # Коды откатанных пользователей не должны пережить прогон.
+            for index in range(warmup + requests):
+                codes.forget(SIGNUP_USERNAME.format(index))
+                codes.forget(TOKEN_USERNAME.format(index))
+            reset_caches()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Сравнивает результаты с базовыми.
+    Возвращает список строк (маршрут, метрика, было, стало) с регрессиями.
+    Число запросов сравнивается строго, время - с допуском tolerance.
+    Метрики, которых нет в базовом прогоне, не сравниваются.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        if name not in baseline:
+            continue
+        for metric in COMPARED:
+            if metric not in baseline[name]:
+                continue
+            before, after = baseline[name][metric], metrics[metric]
+            limit = before if metric == 'queries' else before * (
+                1 + tolerance
+            )
+            if after > limit:
+                regressions.append((name, metric, before, after))
+    return regressions
+
+
+def compare_title_serialization(limit=100, repeats=20, using='default',
+                                **dataset):
+    """
+    Сравнивает сборку страницы произведений сериализатором и через
+    .values() (api.fast_read). Запросы к базе входят в замер.
+    Возвращает медианы в миллисекундах, ускорение и совпадение ответов.
+    """
+    fields = TitleReadSerializer.Meta.fields
+
+    def serializer_page():
+        queryset = Title.objects.using(using).select_related(
+            'category'
+        ).prefetch_related(
+            Prefetch('genre', queryset=Genre.objects.order_by('slug'))
+        )
+        return TitleReadSerializer(queryset[:limit], many=True).data
+
+    def values_page():
+        rows = Title.objects.using(using).values(*title_columns(fields))
+        return build_titles(list(rows[:limit]), fields)
+
+    timings = {}
+    with transaction.atomic(using=using):
+        try:
+            seed_dataset(using=using, **dataset)
+            reset_caches()
+            pages = {}
+            for name, build in (
+                ('serializer', serializer_page), ('values', values_page)
+            ):
+                latencies = []
+                for _ in range(repeats):
+                    started = time.perf_counter()
+                    pages[name] = build()
+                    latencies.append(time.perf_counter() - started)
+                timings[name] = percentile(latencies, 0.5) * 1000
+        finally:
+            transaction.set_rollback(True, using=using)
+            reset_caches()
+    return {
+        'serializer_ms': round(timings['serializer'], 3),
+        'values_ms': round(timings['values'], 3),
+        'speedup': round(timings['serializer'] / timings['values'], 2),
+        'identical': [dict(title) for title in pages['serializer']]
+        == pages['values'],
+    }
@@ -0,0 +1,126 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import urlencode
+from rest_framework.response import Response
+
+from . import replicas
+
+NAMESPACES = ('titles', 'categories', 'genres')
+KEY_PREFIX = 'response-cache'
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _version_key(namespace):
+    return f'{KEY_PREFIX}:{namespace}:version'
+
+
+def _new_version(cache, namespace):
+    """
+    Заводит версию уникальным значением: ключ версии может быть вытеснен
+    вместе с ответами (MAX_ENTRIES), и счет с 1 вернул бы старые ответы.
+    """
+    cache.add(_version_key(namespace), time.time_ns(), None)
+    return cache.get(_version_key(namespace))
+
+
+def get_version(namespace):
+    """Текущая версия пространства имен; хранится без срока жизни."""
+    cache = get_cache()
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        return _new_version(cache, namespace)
+    return version
+
+
+def bump_version(*namespaces):
+    """Инвалидирует все закешированные ответы пространств имен."""
+    cache = get_cache()
+    for namespace in namespaces:
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:
+            _new_version(cache, namespace)
+
+
+def invalidate(*namespaces):
+    """
+    Сдвигает версии сразу и еще раз после фиксации транзакции:
+    ответ, построенный до коммита, не закрепится под новой версией.
+    """
+    if namespaces:
+        bump_version(*namespaces)
+        transaction.on_commit(lambda: bump_version(*namespaces))
+
+
+def _count(namespace, outcome):
+    cache = get_cache()
+    key = f'{KEY_PREFIX}:{namespace}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_stats():
+    """Счетчики попаданий и промахов по пространствам имен."""
+    cache = get_cache()
+    return {
+        namespace: {
+            outcome: cache.get(f'{KEY_PREFIX}:{namespace}:{outcome}', 0)
+            for outcome in ('hits', 'misses')
+        }
+        for namespace in NAMESPACES
+    }
+
+
+def build_key(namespace, request, action):
+    """Ключ ответа: версия, хост, путь и отсортированная строка запроса."""
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    return ':'.join((
+        KEY_PREFIX, namespace, str(get_version(namespace)), action,
+        request.get_host(), request.path, query,
+    ))
+
+
+def _timeout():
+    """
+    Срок жизни ответа. Реплика могла еще не получить запись, после которой
+    сменилась версия, поэтому прочитанный с нее ответ живет не дольше
+    окна репликации REPLICA_PIN_SECONDS.
+    """
+    if replicas.current() is None:
+        return settings.RESPONSE_CACHE_TIMEOUT
+    return min(
+        settings.RESPONSE_CACHE_TIMEOUT, settings.REPLICA_PIN_SECONDS
+    )
+
+
+def serve_cached(namespace, request, action, handler, *args, **kwargs):
+    """
+    Отдает ответ для анонимного GET из кеша или строит и сохраняет его.
+    В кеше лежат уже сериализованные данные, рендер выполняется заново,
+    поэтому ответ не зависит от выбранного рендерера.
+    """
+    if request.method != 'GET' or request.user.is_authenticated:
+        return handler(request, *args, **kwargs)
+    cache = get_cache()
+    key = build_key(namespace, request, action)
+    data = cache.get(key)
+    if data is not None:
+        _count(namespace, 'hits')
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+    _count(namespace, 'misses')
+    response = handler(request, *args, **kwargs)
+    if response.status_code == 200:
+        cache.set(key, response.data, _timeout())
+    response['X-Cache'] = 'MISS'
+    return response
@@ -0,0 +1,131 @@
+"""
+Справочники категорий и жанров в памяти процесса.
+Таблицы маленькие и почти не меняются, поэтому каждый воркер держит
+их целиком: карты slug -> id и id -> объект.
+Актуальность проверяется по поколению в кеше Django: сигналы
+увеличивают его, и все воркеры перечитывают таблицу при следующем
+обращении.
+На кеше одного процесса (LocMemCache) сдвиг поколения в других
+воркерах не виден, поэтому там таблица читается при каждом обращении.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router, transaction
+from reviews.models import Category, Genre
+
+from api_yamdb.cache import is_shared
+
+KEY_PREFIX = 'catalog'
+
+
+def get_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+class Catalog:
+    """Все объекты одной модели-справочника в порядке первичного ключа."""
+
+    def __init__(self, model):
+        self.model = model
+        self.key = f'{KEY_PREFIX}:{model._meta.label_lower}:generation'
+        self._lock = threading.Lock()
+        self._generation = None
+        self._objects = ()
+        self._by_id = {}
+        self._by_slug = {}
+
+    def generation(self):
+        """
+        Текущее поколение из кеша.
+        Пропавший ключ заводится заново уникальным значением,
+        чтобы после очистки кеша воркеры не приняли старые данные.
+        """
+        cache = get_cache()
+        generation = cache.get(self.key)
+        if generation is not None:
+            return generation
+        cache.add(self.key, time.time_ns(), None)
+        return cache.get(self.key)
+
+    def bump(self):
+        """Делает данные всех процессов устаревшими."""
+        cache = get_cache()
+        try:
+            cache.incr(self.key)
+        except ValueError:
+            cache.add(self.key, time.time_ns(), None)
+
+    def _load(self):
+        if not is_shared(settings.CATALOG_CACHE_ALIAS):
+            with self._lock:
+                self._reload(None)
+            return
+        generation = self.generation()
+        if generation == self._generation:
+            return
+        with self._lock:
+            if generation == self._generation:
+                return
+            self._reload(generation)
+
+    def _reload(self, generation):
+        # Читаем с основной базы: реплика может еще не знать
+        # об изменении, после которого сменилось поколение.
+        using = router.db_for_write(self.model)
+        objects = tuple(self.model.objects.using(using).order_by('pk'))
+        self._by_id = {obj.pk: obj for obj in objects}
+        self._by_slug = {obj.slug: obj for obj in objects}
+        self._objects = objects
+        self._generation = generation
+
+    def all(self):
+        self._load()
+        return list(self._objects)
+
+    def get(self, pk):
+        """Объект по id или None."""
+        return self.get_many([pk]).get(pk)
+
+    def get_many(self, pks):
+        """
+        Объекты по id: {id: объект}.
+        id приходят из внешних ключей, поэтому промах значит, что строку
+        добавили в обход сигналов (bulk_create, другой процесс):
+        таблица перечитывается, а не считается пустой.
+        """
+        self._load()
+        if not self._by_id.keys() >= set(pks):
+            with self._lock:
+                self._reload(self.generation())
+        return {pk: self._by_id[pk] for pk in pks if pk in self._by_id}
+
+    def by_slug(self, slug):
+        """Объект по slug или None."""
+        self._load()
+        return self._by_slug.get(slug)
+
+    def search(self, value):
+        """Объекты, в названии которых есть все слова value."""
+        terms = value.replace(',', ' ').lower().split()
+        return [
+            obj for obj in self.all()
+            if all(term in obj.name.lower() for term in terms)
+        ]
+
+
+CATALOGS = {model: Catalog(model) for model in (Category, Genre)}
+
+
+def invalidate(*models):
+    """
+    Сдвигает поколение сразу и еще раз после фиксации транзакции:
+    воркер, перечитавший таблицу до коммита, не закрепит старые данные.
+    """
+    for model in models:
+        catalog = CATALOGS.get(model)
+        if catalog is not None:
+            catalog.bump()
+            transaction.on_commit(catalog.bump)
@@ -0,0 +1,51 @@
+from hashlib import md5
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from reviews.models import Title
+
+
+def title_validators(request, title_id):
+    """
+    ETag и Last-Modified произведения по одному запросу к первичному ключу.
+    Возвращает None, если произведения нет.
+    """
+    if not str(title_id).isdigit():
+        return None
+    updated_at = (
+        Title.objects.filter(pk=title_id)
+        .values_list('updated_at', flat=True).first()
+    )
+    if updated_at is None:
+        return None
+    variant = ':'.join((
+        request.get_full_path(),
+        request.accepted_media_type or '',
+        updated_at.isoformat(),
+    ))
+    return (
+        quote_etag(md5(variant.encode()).hexdigest()),
+        updated_at.timestamp(),
+    )
+
+
+def serve_conditional(request, title_pk, handler, *args, **kwargs):
+    """
+    Отвечает 304 без вызова обработчика, если клиентская копия актуальна.
+    Иначе вызывает обработчик и добавляет к ответу валидаторы.
+    """
+    if request.method != 'GET':
+        return handler(request, *args, **kwargs)
+    validators = title_validators(request, title_pk)
+    if validators is None:
+        return handler(request, *args, **kwargs)
+    etag, last_modified = validators
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified)
+    )
+    if response is None:
+        response = handler(request, *args, **kwargs)
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+    return response
@@ -0,0 +1,87 @@
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from reviews.models import Title
+
+FIELDS = ('id', 'name', 'year', 'category', 'genre', 'rating', 'description')
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+def iter_titles(using=DEFAULT_DB_ALIAS, chunk_size=2000):
+    """
+    Построчно отдает весь каталог со slug категории, жанрами и рейтингом.
+    Строки читаются серверным курсором, жанры - одним запросом на пачку.
+    Все чтения идут в одной транзакции REPEATABLE READ, поэтому выгрузка
+    согласована, даже если каталог меняется во время ее чтения.
+    """
+    connection = connections[using]
+    outermost = not connection.in_atomic_block
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql' and outermost:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, '
+                    'READ ONLY'
+                )
+        rows = (
+            Title.objects.using(using).order_by('pk')
+            .values_list(
+                'id', 'name', 'year', 'category__slug', 'rating',
+                'description'
+            )
+            .iterator(chunk_size=chunk_size)
+        )
+        genre_title = Title.genre.through.objects.using(using)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            genres = defaultdict(list)
+            for title_id, slug in (
+                genre_title.filter(title_id__in=[row[0] for row in chunk])
+                .order_by('title_id', 'genre__slug')
+                .values_list('title_id', 'genre__slug')
+            ):
+                genres[title_id].append(slug)
+            for pk, name, year, category, rating, description in chunk:
+                yield {
+                    'id': pk,
+                    'name': name,
+                    'year': year,
+                    'category': category,
+                    'genre': genres[pk],
+                    'rating': rating,
+                    'description': description,
+                }
+
+
+def render_ndjson(titles):
+    for title in titles:
+        yield json.dumps(title, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """Псевдофайл: csv.writer возвращает готовую строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def render_csv(titles):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS)
+    for title in titles:
+        title['genre'] = ','.join(title['genre'])
+        yield writer.writerow(title[field] for field in FIELDS)
+
+
+RENDERERS = {'ndjson': render_ndjson, 'csv': render_csv}
+
+
+def export_titles(file_format='ndjson', using=DEFAULT_DB_ALIAS,
+                  chunk_size=2000):
+    """Генератор строк выгрузки в выбранном формате."""
+    return RENDERERS[file_format](iter_titles(using, chunk_size))
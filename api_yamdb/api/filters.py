@@ -1,30 +1,57 @@
 # from django_filters import rest_framework as filters
 import django_filters
-from reviews.models import Title
+from reviews.models import Category, Genre, Title
+from reviews.search import search_titles
+
+from .catalog import CATALOGS
 
 
 class TitlesFilter(django_filters.rest_framework.FilterSet):
     """
     Кастомный класс для фильтрации.
     Тут мы определяем, как фильтровать поля модели.
+    Год, категория и жанр сравниваются точно, чтобы работали индексы.
+    Slug категории и жанра переводится в id по справочнику в памяти,
+    без соединения с их таблицами.
     """
     name = django_filters.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
-    year = django_filters.NumberFilter(
+    year = django_filters.NumberFilter(field_name='year')
+    year__gte = django_filters.NumberFilter(
         field_name='year',
-        lookup_expr='icontains'
+        lookup_expr='gte'
     )
-    category = django_filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
+    year__lte = django_filters.NumberFilter(
+        field_name='year',
+        lookup_expr='lte'
     )
-    genre = django_filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
+    category = django_filters.CharFilter(method='filter_catalog')
+    genre = django_filters.CharFilter(method='filter_catalog')
+    search = django_filters.CharFilter(method='filter_search')
+    rating = django_filters.NumberFilter(field_name='rating')
+    rating__gte = django_filters.NumberFilter(
+        field_name='rating',
+        lookup_expr='gte'
+    )
+    rating__lte = django_filters.NumberFilter(
+        field_name='rating',
+        lookup_expr='lte'
     )
 
     class Meta:
         model = Title
-        fields = ['name', 'year', 'category', 'genre']
+        fields = ['name', 'year', 'category', 'genre', 'rating', 'search']
+
+    def filter_catalog(self, queryset, name, value):
+        """Фильтр по slug категории или жанра; неизвестный slug - пусто."""
+        model = Category if name == 'category' else Genre
+        obj = CATALOGS[model].by_slug(value)
+        if obj is None:
+            return queryset.none()
+        return queryset.filter(**{name: obj.pk})
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по индексу, от самых релевантных."""
+        return search_titles(queryset, value)
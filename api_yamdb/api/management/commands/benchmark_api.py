@@ -0,0 +1,110 @@
+import json
+
+from api.benchmark import ROUTES, compare, compare_title_serialization, run
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержки, пропускную способность и число SQL-запросов '
+        'эндпоинтов API на синтетических данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=100)
+        parser.add_argument('--genres', type=int, default=10)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--reviews-per-title', type=int, default=5)
+        parser.add_argument('--comments-per-review', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--route', action='append', dest='routes',
+            choices=[name for name, _ in ROUTES],
+            help='Замерить только этот маршрут; можно повторять.'
+        )
+        parser.add_argument(
+            '--anonymous', action='store_true',
+            help='Запросы без токена: публичные маршруты через кеш ответов.'
+        )
+        parser.add_argument(
+            '--output', help='Файл для результатов в JSON.'
+        )
+        parser.add_argument(
+            '--baseline', '--compare',
+            help='JSON с прошлым прогоном для сравнения. '
+                 'Базовый прогон CI: benchmarks/baseline.json.'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимый рост времени относительно базового прогона.'
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Завершиться с ошибкой, если найдены регрессии.'
+        )
+        parser.add_argument(
+            '--title-serialization', action='store_true',
+            help='Сравнить сериализатор произведений с чтением через values().'
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options['title_serialization']:
+            result = compare_title_serialization(
+                repeats=options['requests'],
+                using=options['database'],
+                titles=options['titles'],
+                genres=options['genres'],
+                categories=options['categories'],
+                users=options['users'],
+                reviews_per_title=options['reviews_per_title'],
+                comments_per_review=options['comments_per_review'],
+                seed=options['seed'],
+            )
+            self.stdout.write(
+                f'serializer {result["serializer_ms"]} мс  '
+                f'values {result["values_ms"]} мс  '
+                f'ускорение x{result["speedup"]}  '
+                f'ответы совпадают: {result["identical"]}'
+            )
+            return
+        results = run(
+            routes=options['routes'],
+            requests=options['requests'],
+            warmup=options['warmup'],
+            anonymous=options['anonymous'],
+            using=options['database'],
+            titles=options['titles'],
+            genres=options['genres'],
+            categories=options['categories'],
+            users=options['users'],
+            reviews_per_title=options['reviews_per_title'],
+            comments_per_review=options['comments_per_review'],
+            seed=options['seed'],
+        )
+        for name, metrics in results.items():
+            self.stdout.write(
+                f'{name:<18} p50 {metrics["p50_ms"]:>8} мс  '
+                f'p90 {metrics["p90_ms"]:>8} мс  '
+                f'p99 {metrics["p99_ms"]:>8} мс  '
+                f'{metrics["rps"]:>8} rps  {metrics["queries"]} SQL'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(results, output, ensure_ascii=False, indent=2)
+        if not options['baseline']:
+            return
+        with open(options['baseline'], encoding='utf-8') as baseline:
+            regressions = compare(
+                results, json.load(baseline), options['tolerance']
+            )
+        for name, metric, before, after in regressions:
+            self.stdout.write(
+                self.style.WARNING(f'{name}: {metric} {before} -> {after}')
+            )
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'Найдено регрессий: {len(regressions)}')
@@ -0,0 +1,93 @@
+import io
+import sys
+import time
+
+from api.benchmark import percentile
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает задержки запросов с пулом соединений и без него. '
+        'Запросы проходят полный цикл WSGI, поэтому без пула каждый '
+        'открывает новое соединение с базой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/api/v1/titles/')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument(
+            '--anonymous', action='store_true',
+            help='Без токена; ответы могут отдаваться из кеша без базы.'
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[DEFAULT_DB_ALIAS]
+        if not hasattr(connection, 'get_pool'):
+            raise CommandError(
+                'База default работает без пула: задайте DB_POOL=True.'
+            )
+        pool_options = connection.settings_dict.get('POOL') or {}
+        environ = self.environ(options['url'], options['anonymous'])
+        handler = WSGIHandler()
+        connection.close()
+        try:
+            for mode, pool in (('без пула', None), ('с пулом', pool_options)):
+                connection.settings_dict['POOL'] = pool
+                for _ in range(options['warmup']):
+                    self.request(handler, environ)
+                latencies = [
+                    self.request(handler, environ)
+                    for _ in range(options['requests'])
+                ]
+                connection.close()
+                self.stdout.write(
+                    f'{mode:<9} p50 {percentile(latencies, 0.5) * 1000:.2f} мс'
+                    f'  p99 {percentile(latencies, 0.99) * 1000:.2f} мс'
+                    f'  {len(latencies) / sum(latencies):.0f} rps'
+                )
+        finally:
+            connection.settings_dict['POOL'] = pool_options
+
+    def environ(self, url, anonymous):
+        path, _, query = url.partition('?')
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'wsgi.url_scheme': 'http',
+            'wsgi.errors': sys.stderr,
+        }
+        # С токеном ответ не берется из кеша и всегда идет в базу.
+        user = None if anonymous else User.objects.filter(
+            is_active=True
+        ).order_by('pk').first()
+        if user is not None:
+            environ['HTTP_AUTHORIZATION'] = (
+                f'Bearer {AccessToken.for_user(user)}'
+            )
+        return environ
+
+    def request(self, handler, environ):
+        statuses = []
+        started = time.perf_counter()
+        response = handler(
+            dict(environ, **{'wsgi.input': io.BytesIO()}),
+            lambda status, headers: statuses.append(status),
+        )
+        for _ in response:
+            pass
+        # close() шлет request_finished: Django закрывает соединение
+        # или возвращает его в пул.
+        response.close()
+        if not statuses[0].startswith('200'):
+            raise CommandError(f'{environ["PATH_INFO"]}: {statuses[0]}')
+        return time.perf_counter() - started
@@ -0,0 +1,31 @@
+from api.export import RENDERERS, export_titles
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка каталога произведений с рейтингом.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', dest='file_format', choices=sorted(RENDERERS),
+            default='ndjson'
+        )
+        parser.add_argument(
+            '--output', help='Файл выгрузки; по умолчанию stdout.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        lines = export_titles(
+            options['file_format'], options['database'],
+            options['chunk_size']
+        )
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as output:
+            output.writelines(lines)
@@ -0,0 +1,159 @@
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from . import replicas
+
+logger = logging.getLogger('api.slow_requests')
+
+# Сколько SQL-запросов попадает в журнал медленного запроса.
+MAX_LOGGED_QUERIES = 50
+
+_local = threading.local()
+
+
+class RequestProfile:
+    """Счетчики одного запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.queries = []
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries.append(sql)
+
+
+def _timed_serializer(method):
+    """Считает время сериализатора верхнего уровня, без вложенных."""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profile = getattr(_local, 'profile', None)
+        if profile is None:
+            return method(self, *args, **kwargs)
+        profile.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            profile.serializer_depth -= 1
+            if not profile.serializer_depth:
+                profile.serializer_time += time.perf_counter() - started
+
+    wrapper.profiled = True
+    return wrapper
+
+
+def _patch_serializers():
+    for cls, name in (
+        (serializers.BaseSerializer, 'is_valid'),
+        (serializers.Serializer, 'data'),
+        (serializers.ListSerializer, 'data'),
+    ):
+        attribute = cls.__dict__[name]
+        if isinstance(attribute, property):
+            if not getattr(attribute.fget, 'profiled', False):
+                setattr(cls, name, property(_timed_serializer(attribute.fget)))
+        elif not getattr(attribute, 'profiled', False):
+            setattr(cls, name, _timed_serializer(attribute))
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+class RequestProfilingMiddleware:
+    """
+    Считает SQL-запросы, время БД, сериализаторов и view,
+    отдает их в заголовке Server-Timing и пишет в журнал запросы,
+    вышедшие за бюджет. Включается настройкой REQUEST_PROFILING;
+    без нее Django исключает middleware из цепочки.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        _patch_serializers()
+
+    def __call__(self, request):
+        profile = _local.profile = RequestProfile()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(profile.record_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            _local.profile = None
+        finished = time.perf_counter()
+        total = finished - profile.started
+        view = finished - (profile.view_started or profile.started)
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={_ms(profile.db_time)};'
+            f'desc="{len(profile.queries)} queries"',
+            f'serializer;dur={_ms(profile.serializer_time)}',
+            f'view;dur={_ms(view)}',
+            f'total;dur={_ms(total)}',
+        ))
+        if (
+            len(profile.queries) > settings.REQUEST_PROFILING_MAX_QUERIES
+            or _ms(total) > settings.REQUEST_PROFILING_MAX_MS
+        ):
+            self.log_slow(request, response, profile, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _local.profile.view_started = time.perf_counter()
+
+    def log_slow(self, request, response, profile, total):
+        logger.warning(
+            'Медленный запрос %s %s: %s, %d запросов, БД %s мс, '
+            'всего %s мс\n%s',
+            request.method, request.get_full_path(), response.status_code,
+            len(profile.queries), _ms(profile.db_time), _ms(total),
+            '\n'.join(profile.queries[:MAX_LOGGED_QUERIES]),
+        )
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Безопасные запросы читают с одной из реплик REPLICA_DATABASES,
+    остальные работают с основной базой. После записи автор на
+    REPLICA_PIN_SECONDS закрепляется за основной базой: по cookie
+    и по id пользователя из JWT. Без реплик middleware отключен.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            replicas.pin(request, response)
+            return response
+        if replicas.is_pinned(request):
+            return self.get_response(request)
+        with replicas.read_from(random.choice(settings.REPLICA_DATABASES)):
+            return self.get_response(request)
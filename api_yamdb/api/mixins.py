@@ -1,7 +1,149 @@
+from django.shortcuts import get_object_or_404
 from rest_framework import mixins, viewsets
+from rest_framework.exceptions import ValidationError
+from reviews.models import Review, Title
 
+from .cache import serve_cached
 
-class CustomMixSet(mixins.ListModelMixin, mixins.CreateModelMixin,
-                   mixins.DestroyModelMixin, viewsets.GenericViewSet):
+
+class CachedReadMixin:
+    """
+    Кеширует ответы на анонимные GET-запросы списка.
+    cache_namespace задает группу ключей, которую сбрасывают сигналы.
+    """
+    cache_namespace = None
+
+    def serve_cached(self, handler, request, *args, **kwargs):
+        return serve_cached(
+            self.cache_namespace, request, self.action,
+            handler, *args, **kwargs
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.serve_cached(super().list, request, *args, **kwargs)
+
+
+def _names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsMixin:
+    """
+    ?fields=id,name оставляет в ответе только перечисленные поля,
+    ?expand=genre добавляет к ним связанные объекты.
+    Без fields ответ полный, как раньше.
+    """
+    sparse_fields = ()
+    expandable = ()
+
+    def get_requested_fields(self):
+        """Поля ответа в исходном порядке или None для полного ответа."""
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = self._parse_fields()
+        return self._requested_fields
+
+    def _parse_fields(self):
+        params = self.request.query_params
+        fields = _names(params.get('fields', ''))
+        expand = _names(params.get('expand', ''))
+        errors = {}
+        unknown = set(fields) - set(self.sparse_fields)
+        if unknown:
+            errors['fields'] = (
+                f'Неизвестные поля: {", ".join(sorted(unknown))}'
+            )
+        unknown = set(expand) - set(self.expandable)
+        if unknown:
+            errors['expand'] = (
+                f'Можно раскрыть только: {", ".join(self.expandable)}'
+            )
+        if errors:
+            raise ValidationError(errors)
+        if not fields:
+            return None
+        requested = set(fields) | set(expand)
+        return tuple(name for name in self.sparse_fields if name in requested)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in ('list', 'retrieve'):
+            kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+
+class ExpandMixin:
+    """
+    ?expand=review раскрывает объектами связи,
+    которые по умолчанию отдаются по id.
+    """
+    expandable = ()
+
+    def get_expanded(self):
+        """Раскрываемые связи из запроса."""
+        if not hasattr(self, '_expanded'):
+            expand = _names(self.request.query_params.get('expand', ''))
+            if set(expand) - set(self.expandable):
+                raise ValidationError({'expand': (
+                    f'Можно раскрыть только: {", ".join(self.expandable)}'
+                )})
+            self._expanded = tuple(expand)
+        return self._expanded
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method == 'GET':
+            kwargs.setdefault('expand', self.get_expanded())
+        return super().get_serializer(*args, **kwargs)
+
+
+class NestedResourceMixin:
+    """
+    Родители вложенных маршрутов по title_id и review_id.
+    Загружаются не больше одного раза за запрос и переиспользуются
+    в get_queryset, perform_create и сериализаторе.
+    """
+
+    def get_title(self):
+        """Произведение из title_id или 404."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(Title, pk=self.kwargs['title_id'])
+        return self._title
+
+    def get_review(self):
+        """Отзыв из review_id, принадлежащий произведению, или 404."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                pk=self.kwargs['review_id'],
+                title_id=self.kwargs['title_id'],
+            )
+        return self._review
+
+    def is_detail(self):
+        """Маршрут объекта: родителя проверит фильтр запроса к нему."""
+        return (self.lookup_url_kwarg or self.lookup_field) in self.kwargs
+
+
+class CatalogListMixin:
+    """
+    Список справочника из памяти процесса (api.catalog) с поиском
+    по названию; запись и удаление работают с базой как обычно.
+    """
+    catalog = None
+
+    def get_queryset(self):
+        if self.action == 'list':
+            return self.catalog.all()
+        return super().get_queryset()
+
+    def filter_queryset(self, queryset):
+        if self.action == 'list':
+            return self.catalog.search(
+                self.request.query_params.get('search', '')
+            )
+        return super().filter_queryset(queryset)
+
+
+class CustomMixSet(CachedReadMixin, mixins.ListModelMixin,
+                   mixins.CreateModelMixin, mixins.DestroyModelMixin,
+                   viewsets.GenericViewSet):
     """Кастомный миксин для Create, List, Delete операций"""
     pass
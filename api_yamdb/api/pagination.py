@@ -0,0 +1,10 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PubDateCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация лент отзывов и комментариев по (pub_date, id).
+    Не выполняет COUNT(*) и не сканирует OFFSET, поэтому глубокие
+    страницы стоят столько же, сколько первая.
+    """
+    ordering = ('pub_date', 'id')
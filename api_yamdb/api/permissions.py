@@ -1,48 +1,57 @@
+from collections import namedtuple
+
 from rest_framework import permissions
 
+Roles = namedtuple(
+    'Roles', ('user_id', 'is_authenticated', 'is_admin', 'is_moderator')
+)
+
+ANONYMOUS = Roles(None, False, False, False)
+
+
+def get_roles(request):
+    """Роли пользователя вычисляются один раз за запрос."""
+    roles = getattr(request, '_roles', None)
+    if roles is None:
+        user = request.user
+        roles = ANONYMOUS
+        if user and user.is_authenticated:
+            roles = Roles(
+                user.pk, True, user.is_admin, user.is_moderator
+            )
+        request._roles = roles
+    return roles
+
+
+def is_author(request, obj):
+    """Сравнение по author_id не загружает автора объекта."""
+    return obj.author_id == get_roles(request).user_id
+
 
 class IsRoleAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
-        return (
-            request.user
-            and request.user.is_authenticated
-            and request.user.is_admin
-        )
+        return get_roles(request).is_admin
 
     def has_object_permission(self, request, view, obj):
-        return (
-            request.user
-            and request.user.is_authenticated
-            and request.user.is_admin
-        )
+        return get_roles(request).is_admin
 
 
 class IsRoleModerator(permissions.BasePermission):
     def has_permission(self, request, view):
-        return (
-            request.user
-            and request.user.is_authenticated
-            and request.user.is_moderator
-        )
+        return get_roles(request).is_moderator
 
     def has_object_permission(self, request, view, obj):
-        return (
-            request.user
-            and request.user.is_authenticated
-            and request.user.is_moderator
-        )
+        return get_roles(request).is_moderator
 
 
 class IsRoleAuthor(permissions.BasePermission):
     def has_permission(self, request, view):
         return (
-            request.user and request.user.is_authenticated
+            get_roles(request).is_authenticated
             or request.method in permissions.SAFE_METHODS)
 
     def has_object_permission(self, request, view, obj):
-        return (
-            obj.author == request.user
-        )
+        return is_author(request, obj)
 
 
 class ReadOnly(permissions.BasePermission):
@@ -58,13 +67,13 @@ class ReadOnly(permissions.BasePermission):
 class IsAuthorOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         return (
-            request.user and request.user.is_authenticated
+            get_roles(request).is_authenticated
             or request.method in permissions.SAFE_METHODS)
 
     def has_object_permission(self, request, view, obj):
         return (
-            obj.author == request.user
-            or request.method in permissions.SAFE_METHODS
+            request.method in permissions.SAFE_METHODS
+            or is_author(request, obj)
         )
 
 
@@ -72,20 +81,25 @@ class IsRoleAdminOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         return (
             request.method in permissions.SAFE_METHODS
-            or request.user.is_authenticated and request.user.is_admin
+            or get_roles(request).is_admin
         )
 
 
 class IsAuthorOrAdminOrModerReadOnly(permissions.BasePermission):
+    """
+    Чтение всем, запись автору, модератору и администратору.
+    Заменяет цепочку IsRoleAuthor | ReadOnly | IsRoleAdmin | IsRoleModerator.
+    """
+
     def has_permission(self, request, view):
         return (
-            request.user and request.user.is_authenticated
-            or request.method in permissions.SAFE_METHODS
+            request.method in permissions.SAFE_METHODS
+            or get_roles(request).is_authenticated
         )
 
     def has_object_permission(self, request, view, obj):
         return (
-            obj.author == request.user
-            or request.method in permissions.SAFE_METHODS
-            or request.user.is_moderator or request.user.is_admin
+            request.method in permissions.SAFE_METHODS
+            or get_roles(request).is_moderator
+            or is_author(request, obj)
         )
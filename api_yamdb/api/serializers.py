@@ -1,9 +1,20 @@
-from django.shortcuts import get_object_or_404
+import re
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.settings import api_settings
 from reviews.models import Category, Comment, Genre, Review, Title
 from reviews.validators import username_validation
+from users import codes
 from users.models import User
 
+from .batch import write_genres
+from .cache import invalidate
+from .catalog import CATALOGS
+
 
 class CategorySerializer(serializers.ModelSerializer):
     """Сериализатор для модели Category."""
@@ -32,7 +43,33 @@ class TitleReadSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = (
+            'id', 'category', 'genre', 'rating', 'name', 'year', 'description'
+        )
+
+    def __init__(self, *args, fields=None, **kwargs):
+        """fields оставляет в ответе только указанные поля."""
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class CatalogSlugField(serializers.SlugRelatedField):
+    """Slug категории или жанра, проверенный по справочнику в памяти."""
+
+    def __init__(self, **kwargs):
+        super().__init__(slug_field='slug', **kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        obj = CATALOGS[self.queryset.model].by_slug(data)
+        if obj is None:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field, value=data
+            )
+        return obj
 
 
 class TitleWriteSerializer(serializers.ModelSerializer):
@@ -40,19 +77,66 @@ class TitleWriteSerializer(serializers.ModelSerializer):
     Сериализатор для модели Title.
     Только для операций записи.
     """
-    category = serializers.SlugRelatedField(
-        queryset=Category.objects.all(),
-        slug_field='slug'
-    )
-    genre = serializers.SlugRelatedField(
-        queryset=Genre.objects.all(),
-        slug_field='slug',
-        many=True
-    )
+    category = CatalogSlugField(queryset=Category.objects.all())
+    genre = CatalogSlugField(queryset=Genre.objects.all(), many=True)
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = ('id', 'category', 'genre', 'name', 'year', 'description')
+
+    def create(self, validated_data):
+        genre = validated_data.pop('genre', ())
+        with transaction.atomic():
+            title = super().create(validated_data)
+            write_genres(
+                {title.pk: [obj.pk for obj in genre]}, created={title.pk}
+            )
+        return title
+
+    def update(self, instance, validated_data):
+        """
+        Жанры пишутся разницей с текущими связями, без m2m_changed.
+        Сброс от сохранения произведения случился до записи связей,
+        поэтому после нее произведение трогается и кеш сбрасывается еще раз.
+        """
+        genre = validated_data.pop('genre', None)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            if genre is not None and any(write_genres(
+                {instance.pk: [obj.pk for obj in genre]}
+            )):
+                Title.objects.filter(pk=instance.pk).touch()
+                invalidate('titles')
+        return instance
+
+
+class TitleIdsSerializer(serializers.Serializer):
+    """
+    Параметр ?ids=1,2,3 для выборки произведений по списку.
+    Повторы убираются, порядок сохраняется, длина ограничена
+    настройкой TITLE_IDS_MAX_SIZE.
+    """
+    ids = serializers.CharField()
+
+    def validate_ids(self, value):
+        limit = settings.TITLE_IDS_MAX_SIZE
+        items = value.split(',', limit)
+        if len(items) > limit:
+            raise serializers.ValidationError(
+                f'Не больше {limit} id за запрос'
+            )
+        ids, seen = [], set()
+        for item in items:
+            item = item.strip()
+            if not re.fullmatch(r'\d+', item, re.ASCII):
+                raise serializers.ValidationError(
+                    f'Ожидаются id через запятую, получено: {item!r}'
+                )
+            pk = int(item)
+            if pk not in seen:
+                seen.add(pk)
+                ids.append(pk)
+        return ids
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -66,38 +150,49 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         exclude = ('title',)
 
-    def validate(self, data):
+    def create(self, validated_data):
         """
-        Проверяет не писал ли уже автор POST запроса
-        отзыв на это произведение раньше.
+        Повторный отзыв автора на произведение отклоняет
+        ограничение unique_title_author, без предварительной проверки.
         """
-        request = self.context['request']
-        author = request.user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if (
-            request.method == 'POST'
-            and Review.objects.filter(title=title, author=author).exists()
-        ):
-            raise serializers.ValidationError('Вы уже оставляли свой отзыв!')
-        return data
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Вы уже оставляли свой отзыв!'
+                ]
+            })
+
+
+class ReviewBriefSerializer(serializers.ModelSerializer):
+    """Отзыв внутри комментария при ?expand=review."""
+
+    class Meta:
+        model = Review
+        fields = ('id', 'text')
 
 
 class CommentSerializer(serializers.ModelSerializer):
-    """Сериализатор для модели Comment."""
+    """
+    Сериализатор для модели Comment.
+    Отзыв отдается по id; expand=('review',) раскрывает его объектом.
+    """
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True
     )
-    review = serializers.SlugRelatedField(
-        slug_field='text',
-        read_only=True
-    )
+    review = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         fields = '__all__'
         model = Comment
 
+    def __init__(self, *args, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'review' in expand:
+            self.fields['review'] = ReviewBriefSerializer(read_only=True)
+
 
 class EmailSerializer(serializers.Serializer):
     """Сериализатор для регистрации и отправки кода на email."""
@@ -105,21 +200,27 @@ class EmailSerializer(serializers.Serializer):
     username = serializers.CharField(validators=[username_validation])
 
     def validate(self, data):
-        """Проверка уникальности username и email."""
-        if (
-            User.objects.filter(email=data['email'])
-            .exclude(username=data['username']).exists()
-        ):
-            raise serializers.ValidationError(
-                f'email {data["email"]} уже существует!'
-            )
-        if (
-            User.objects.filter(username=data['username'])
-            .exclude(email=data['email']).exists()
-        ):
-            raise serializers.ValidationError(
-                f'username {data["username"]} уже существует!'
-            )
+        """
+        Проверка уникальности username и email одним запросом.
+        Уже зарегистрированный пользователь попадает в data['user'].
+        """
+        users = User.objects.filter(
+            Q(email=data['email']) | Q(username=data['username'])
+        )[:2]
+        for user in users:
+            if user.email == data['email'] and (
+                user.username != data['username']
+            ):
+                raise serializers.ValidationError(
+                    f'email {data["email"]} уже существует!'
+                )
+            if user.username == data['username'] and (
+                user.email != data['email']
+            ):
+                raise serializers.ValidationError(
+                    f'username {data["username"]} уже существует!'
+                )
+            data['user'] = user
         return data
 
 
@@ -129,12 +230,18 @@ class TokenSerializer(serializers.Serializer):
     confirmation_code = serializers.CharField(required=True)
 
     def validate(self, data):
-        username = data.get('username')
-        user = get_object_or_404(User, username=username)
-        if data.get('confirmation_code') != user.confirmation_code:
+        """Сверяет код и кладет id пользователя в data['user_id']."""
+        try:
+            user_id = codes.redeem(
+                data['username'], data['confirmation_code']
+            )
+        except User.DoesNotExist:
+            raise NotFound(f'Пользователь {data["username"]} не найден.')
+        if user_id is None:
             raise serializers.ValidationError(
                 'Некорректный confirmation_code.'
             )
+        data['user_id'] = user_id
         return data
 
 
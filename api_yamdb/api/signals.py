@@ -0,0 +1,45 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Category, Genre, Review, Title
+from reviews.signals import bulk_loaded
+
+from . import catalog
+from .cache import invalidate
+
+INVALIDATES = {
+    Title: ('titles',),
+    Review: ('titles',),
+    Category: ('titles', 'categories'),
+    Genre: ('titles', 'genres'),
+    Title.genre.through: ('titles',),
+}
+
+
+def invalidate_response_cache(sender, **kwargs):
+    """Сбрасывает версии кеша ответов, зависящих от измененной модели."""
+    invalidate(*INVALIDATES.get(sender, ()))
+    catalog.invalidate(sender)
+
+
+# Только перечисленные модели: обработчик без sender отключает быстрое
+# удаление у всех моделей. Связи жанров отслеживает m2m_changed.
+for model in INVALIDATES:
+    if not model._meta.auto_created:
+        post_save.connect(invalidate_response_cache, sender=model)
+        post_delete.connect(invalidate_response_cache, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate('titles')
+
+
+@receiver(bulk_loaded)
+def invalidate_after_bulk_load(sender, models, **kwargs):
+    invalidate(*{
+        namespace
+        for model in models
+        for namespace in INVALIDATES.get(model, ())
+    })
+    catalog.invalidate(*models)
@@ -1,9 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, SendEmailView, SendToken, TitleViewSet,
-                    UserViewSet)
+from .views import (CacheStatsView, CategoryViewSet, CommentViewSet,
+                    DBPoolStatsView, GenreViewSet, ReviewViewSet,
+                    SendEmailView, SendToken, TitleViewSet, UserViewSet)
 
 app_name = 'api'
 
@@ -30,6 +30,10 @@ auth_urls = [
 ]
 
 urlpatterns = [
+    path('v1/cache-stats/', CacheStatsView.as_view(), name='cache_stats'),
+    path(
+        'v1/db-pool-stats/', DBPoolStatsView.as_view(), name='db_pool_stats'
+    ),
     path('v1/', include(v1_router.urls)),
     path('v1/auth/', include(auth_urls)),
 ]
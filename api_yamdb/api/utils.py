@@ -1,22 +1,21 @@
-from secrets import token_hex
-
-from django.core.mail import send_mail
+from users.outbox import enqueue
 
 from api_yamdb.settings import DEFAULT_FROM_EMAIL
 
 
-def send_confirmation_code(email):
-    key = token_hex(16)
-    send_mail(
+def send_confirmation_code(email, key):
+    """
+    Ставит письмо с кодом подтверждения в очередь.
+    Письмо отправит воркер run_outbox, запрос не ждет SMTP.
+    """
+    enqueue(
         subject='Код подтверждения Yamdb',
-        message=(
+        body=(
             'Ваш код подтверждения указан ниже. Отправьте его и'
             ' username на адрес ...api/v1/auth/token/ и мы поможем'
             ' вам войти в систему.\n'
             f'confirmation_code: {key}'
         ),
         from_email=DEFAULT_FROM_EMAIL,
-        recipient_list=[email],
-        fail_silently=False,
+        recipient=email,
     )
-    return key
@@ -1,7 +1,8 @@
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
-from django.db.models import Avg
-from django.shortcuts import get_object_or_404
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
@@ -10,20 +11,33 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from reviews.models import Category, Comment, Genre, Review, Title
+from users import codes
 from users.models import User
 
+from api_yamdb.db.pool import get_stats as get_pool_stats
+
+from .batch import save_titles
+from .cache import get_stats
+from .catalog import CATALOGS
+from .conditional import serve_conditional
+from .export import CONTENT_TYPES, export_titles
+from .fast_read import build_titles, title_columns
 from .filters import TitlesFilter
-from .mixins import CustomMixSet
-from .permissions import (IsRoleAdmin, IsRoleAdminOrReadOnly, IsRoleAuthor,
-                          IsRoleModerator, ReadOnly)
+from .mixins import (CachedReadMixin, CatalogListMixin, CustomMixSet,
+                     ExpandMixin, NestedResourceMixin, SparseFieldsMixin)
+from .pagination import PubDateCursorPagination
+from .permissions import (IsAuthorOrAdminOrModerReadOnly, IsRoleAdmin,
+                          IsRoleAdminOrReadOnly)
 from .serializers import (CategorySerializer, CommentSerializer,
                           EmailSerializer, GenreSerializer, ReviewSerializer,
-                          TitleReadSerializer, TitleWriteSerializer,
-                          TokenSerializer, UserSerializer)
+                          TitleIdsSerializer, TitleReadSerializer,
+                          TitleWriteSerializer, TokenSerializer,
+                          UserSerializer)
 from .utils import send_confirmation_code
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(CachedReadMixin, SparseFieldsMixin,
+                   viewsets.ModelViewSet):
     """
     Представление модели Title.
     Обрабатывает все запросы с учетом прав доступа.
@@ -32,90 +46,279 @@ class TitleViewSet(viewsets.ModelViewSet):
     Получить конкретное произведение по id - доступно без токена.
     Отредактировать произведение по id - только Админ.
     Удалить произведение по id - только Админ.
+    Параметры fields и expand сужают ответ, например
+    ?fields=id,name,rating&expand=genre.
+    ?ids=1,2,3 отдает произведения списком в порядке запроса.
     """
     permission_classes = [IsRoleAdminOrReadOnly]
-    filter_backends = (DjangoFilterBackend, )
+    filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     filterset_class = TitlesFilter
+    ordering_fields = ('rating', 'year', 'name')
+    cache_namespace = 'titles'
+    sparse_fields = TitleReadSerializer.Meta.fields
+    expandable = ('category', 'genre')
+    # Список собирается из .values() в обход TitleReadSerializer.
+    fast_list_enabled = True
 
     def get_queryset(self):
-        return Title.objects.all().annotate(rating=Avg('title_reviews__score'))
+        if self.action not in ('list', 'retrieve'):
+            # Жанры перечитываются после записи, заранее их не загружаем.
+            return Title.objects.select_related('category')
+        fields = self.get_requested_fields()
+        genres = Prefetch('genre', queryset=Genre.objects.order_by('slug'))
+        if fields is None:
+            return Title.objects.select_related('category').prefetch_related(
+                genres
+            )
+        columns = [name for name in fields if name not in self.expandable]
+        queryset = Title.objects.all()
+        if 'category' in fields:
+            columns += ['category', 'category__name', 'category__slug']
+            queryset = queryset.select_related('category')
+        if 'genre' in fields:
+            genres.queryset = genres.queryset.only('name', 'slug')
+            queryset = queryset.prefetch_related(genres)
+        return queryset.only(*columns)
+
+    def list(self, request, *args, **kwargs):
+        if 'ids' in request.query_params:
+            return self.serve_cached(
+                self.list_by_ids, request, *args, **kwargs
+            )
+        if not self.fast_list_enabled:
+            return super().list(request, *args, **kwargs)
+        return self.serve_cached(self.fast_list, request, *args, **kwargs)
+
+    def list_by_ids(self, request, *args, **kwargs):
+        """
+        ?ids=3,1,2 - произведения в порядке запроса и список
+        ненайденных id, всегда за два запроса к базе.
+        Фильтры и пагинация к выборке по id не применяются.
+        """
+        serializer = TitleIdsSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        fields = self.get_requested_fields() or self.sparse_fields
+        rows = {
+            row['id']: row for row in Title.objects.filter(
+                pk__in=ids
+            ).values(*title_columns(fields))
+        }
+        return Response({
+            'results': build_titles(
+                [rows[pk] for pk in ids if pk in rows], fields
+            ),
+            'missing': [pk for pk in ids if pk not in rows],
+        })
+
+    def fast_list(self, request, *args, **kwargs):
+        fields = self.get_requested_fields() or self.sparse_fields
+        queryset = self.filter_queryset(Title.objects.all()).values(
+            *title_columns(fields)
+        )
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(build_titles(list(queryset), fields))
+        return self.get_paginated_response(build_titles(list(page), fields))
+
+    def retrieve(self, request, *args, **kwargs):
+        return serve_conditional(
+            request, kwargs['pk'], self.cached_retrieve, *args, **kwargs
+        )
+
+    def cached_retrieve(self, request, *args, **kwargs):
+        return self.serve_cached(super().retrieve, request, *args, **kwargs)
 
     def get_serializer_class(self):
         if self.action == 'list' or self.action == 'retrieve':
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    @action(
+        methods=['post'],
+        detail=False,
+        permission_classes=(IsRoleAdmin,)
+    )
+    def batch(self, request):
+        """
+        Создание и обновление произведений пачкой в одной транзакции.
+        Элемент с id обновляет произведение как PATCH, без id - создает.
+        Если хоть один элемент не прошел проверку, ничего не пишется,
+        а ошибки возвращаются списком по позициям элементов.
+        Права доступа: Администратор.
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'non_field_errors': ['Ожидается непустой список']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > settings.TITLE_BATCH_MAX_SIZE:
+            return Response(
+                {'non_field_errors': [
+                    f'Не больше {settings.TITLE_BATCH_MAX_SIZE} '
+                    f'произведений за запрос'
+                ]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        instances = Title.objects.in_bulk([
+            item['id'] for item in items
+            if isinstance(item, dict) and isinstance(item.get('id'), int)
+        ])
+        changes, errors = [], []
+        for item in items:
+            if not isinstance(item, dict):
+                errors.append({'non_field_errors': ['Ожидается объект']})
+                continue
+            instance = None
+            if 'id' in item:
+                instance = instances.get(item['id'])
+                if instance is None:
+                    errors.append({'id': ['Произведение не найдено']})
+                    continue
+            serializer = TitleWriteSerializer(
+                instance, data=item, partial=instance is not None
+            )
+            if not serializer.is_valid():
+                errors.append(serializer.errors)
+                continue
+            errors.append({})
+            changes.append((instance, serializer.validated_data))
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        created, updated = save_titles(changes)
+        return Response({'created': created, 'updated': updated})
+
+    @action(
+        methods=['get'],
+        detail=False,
+        permission_classes=(IsRoleAdmin,)
+    )
+    def export(self, request):
+        """
+        Потоковая выгрузка всего каталога для аналитики.
+        Формат задается параметром file_format: ndjson (по умолчанию) или csv.
+        Права доступа: Администратор.
+        """
+        file_format = request.query_params.get('file_format', 'ndjson')
+        if file_format not in CONTENT_TYPES:
+            return Response(
+                {'file_format': f'Допустимые значения: {list(CONTENT_TYPES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        response = StreamingHttpResponse(
+            export_titles(file_format),
+            content_type=CONTENT_TYPES[file_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="titles.{file_format}"'
+        )
+        return response
+
 
-class CategoryViewSet(CustomMixSet):
+class CategoryViewSet(CatalogListMixin, CustomMixSet):
     """
     Представление модели Category.
     Обрабатывает запросы GET, POST и DEL с учетом прав доступа.
     Получить список всех категорий - доступно без токена.
     Создать новую категорию- только Админ.
     Удалить категорию - только Админ.
+    Список отдается из справочника в памяти процесса.
     """
+    catalog = CATALOGS[Category]
     queryset = Category.objects.all()
     permission_classes = [IsRoleAdminOrReadOnly]
     serializer_class = CategorySerializer
     filter_backends = (filters.SearchFilter, )
     search_fields = ('name', )
     lookup_field = 'slug'
+    cache_namespace = 'categories'
 
 
-class GenreViewSet(CustomMixSet):
+class GenreViewSet(CatalogListMixin, CustomMixSet):
     """
     Представление модели Genre.
     Обрабатывает запросы GET, POST и DEL с учетом прав доступа.
     Получить список всех жанров - доступно без токена.
     Создать новый жанр - только Админ.
     Удалить жанр - только Админ.
+    Список отдается из справочника в памяти процесса.
     """
+    catalog = CATALOGS[Genre]
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = [IsRoleAdminOrReadOnly]
     filter_backends = (filters.SearchFilter, )
     search_fields = ('name', )
     lookup_field = 'slug'
+    cache_namespace = 'genres'
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
-    """Представление модели Review."""
+class ReviewViewSet(NestedResourceMixin, viewsets.ModelViewSet):
+    """
+    Представление модели Review.
+    Произведение загружается один раз за запрос; повторный отзыв
+    отклоняет ограничение unique_title_author в базе.
+    """
     serializer_class = ReviewSerializer
-    permission_classes = [
-        IsRoleAuthor | ReadOnly | IsRoleAdmin | IsRoleModerator
-    ]
+    pagination_class = PubDateCursorPagination
+    permission_classes = [IsAuthorOrAdminOrModerReadOnly]
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.title_reviews.all()
+        if self.is_detail():
+            reviews = Review.objects.filter(title_id=self.kwargs['title_id'])
+        else:
+            reviews = self.get_title().title_reviews.all()
+        return reviews.select_related('author')
+
+    def list(self, request, *args, **kwargs):
+        return serve_conditional(
+            request, kwargs['title_id'], super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return serve_conditional(
+            request, kwargs['title_id'], super().retrieve, *args, **kwargs
+        )
 
     def update(self, request, *args, **kwargs):
         kwargs['partial'] = True
         return super().update(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return serializer.save(author=self.request.user, title=title)
+        return serializer.save(
+            author=self.request.user, title=self.get_title()
+        )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
-    """Представление модели Comment."""
+class CommentViewSet(ExpandMixin, NestedResourceMixin,
+                     viewsets.ModelViewSet):
+    """
+    Представление модели Comment.
+    Отзыв загружается один раз за запрос, комментарий по id
+    проверяется на принадлежность отзыву и произведению одним запросом.
+    Отзыв в ответе - id, ?expand=review отдает его с текстом.
+    """
     serializer_class = CommentSerializer
-    permission_classes = [
-        IsRoleAuthor | ReadOnly | IsRoleAdmin | IsRoleModerator
-    ]
+    pagination_class = PubDateCursorPagination
+    permission_classes = [IsAuthorOrAdminOrModerReadOnly]
+    expandable = ('review',)
 
     def get_queryset(self):
-        review = get_object_or_404(Review,
-                                   pk=self.kwargs['review_id'],
-                                   title__id=self.kwargs['title_id'])
-        return Comment.objects.filter(review=review)
+        if not self.is_detail():
+            return self.get_review().review_comments.select_related('author')
+        comments = Comment.objects.filter(
+            review_id=self.kwargs['review_id'],
+            review__title_id=self.kwargs['title_id'],
+        ).select_related('author')
+        if 'review' not in self.get_expanded():
+            return comments
+        return comments.select_related('review')
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review,
-                                   pk=self.kwargs['review_id'],
-                                   title__id=self.kwargs['title_id'])
-        return serializer.save(author=self.request.user, review=review)
+        return serializer.save(
+            author=self.request.user, review=self.get_review()
+        )
 
 
 class SendEmailView(APIView):
@@ -133,16 +336,17 @@ class SendEmailView(APIView):
     def post(self, request):
         serializer = EmailSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-
+        user = serializer.validated_data.get('user') or User(
+            username=serializer.validated_data['username'],
+            email=serializer.validated_data['email'],
+        )
         try:
-            user, _ = User.objects.get_or_create(
-                **serializer.validated_data
-            )
+            code = codes.issue(user)
         except IntegrityError:
             raise ValidationError(
                 'ОШИБКА - ник или мейл уже занят',
             )
-        send_confirmation_code(user.email)
+        send_confirmation_code(user.email, code)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -157,10 +361,9 @@ class SendToken(APIView):
     def post(self, request):
         serializer = TokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = get_object_or_404(
-            User, username=serializer.validated_data.get('username')
+        refresh = RefreshToken.for_user(
+            User(pk=serializer.validated_data['user_id'])
         )
-        refresh = RefreshToken.for_user(user)
         token = {'access': str(refresh.access_token), }
         return Response(token, status=status.HTTP_201_CREATED)
 
@@ -195,3 +398,25 @@ class UserViewSet(viewsets.ModelViewSet):
 
     def perform_update(self, serializer):
         serializer.save(role=self.request.user.role, partial=True)
+
+
+class CacheStatsView(APIView):
+    """
+    Счетчики попаданий и промахов кеша ответов.
+    Права доступа: Администратор.
+    """
+    permission_classes = [IsRoleAdmin]
+
+    def get(self, request):
+        return Response(get_stats(), status=status.HTTP_200_OK)
+
+
+class DBPoolStatsView(APIView):
+    """
+    Метрики пула соединений с базой в процессе, который ответил.
+    Права доступа: Администратор.
+    """
+    permission_classes = [IsRoleAdmin]
+
+    def get(self, request):
+        return Response(get_pool_stats(), status=status.HTTP_200_OK)
@@ -0,0 +1,16 @@
+"""Проверки настроек кеша, общие для приложений."""
+from django.conf import settings
+
+# Бэкенды, данные которых видит только текущий процесс.
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared(alias):
+    """
+    Видят ли кеш alias все воркеры и команды.
+    Сброс, сделанный в одном процессе, другие заметят только так.
+    """
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
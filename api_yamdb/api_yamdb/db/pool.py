@@ -0,0 +1,199 @@
+"""
+Пул соединений с базой для воркеров gunicorn.
+Django закрывает соединение в конце запроса; бэкенды из этого пакета
+вместо закрытия возвращают его в пул процесса, а при следующем запросе
+выдают обратно после проверки SELECT 1. Пул включается ключом POOL
+в настройках базы:
+
+    'POOL': {
+        'MAX_SIZE': 4,              # соединений на процесс
+        'TIMEOUT': 10,              # ожидание свободного соединения, с
+        'HEALTH_CHECK_AFTER': 0,    # проверять, если простаивало дольше, с
+        'MAX_LIFETIME': 1800,       # пересоздавать соединения старше, с
+    }
+"""
+import os
+import threading
+import time
+from functools import partial
+
+DEFAULTS = {
+    'MAX_SIZE': 4,
+    'TIMEOUT': 10,
+    'HEALTH_CHECK_AFTER': 0,
+    'MAX_LIFETIME': 1800,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolExhaustedError(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Ограниченный пул DB-API соединений одного алиаса в одном процессе."""
+
+    def __init__(self, max_size, timeout, health_check_after, max_lifetime):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self.max_lifetime = max_lifetime
+        self.condition = threading.Condition()
+        # (соединение, время создания, время возврата в пул)
+        self.idle = []
+        self.created_at = {}
+        self.size = 0
+        self.counters = dict.fromkeys((
+            'created', 'reused', 'health_checks', 'health_check_failures',
+            'discarded', 'waits', 'timeouts',
+        ), 0)
+
+    def acquire(self, connect):
+        """Выдает соединение из пула или открывает новое через connect()."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self.condition:
+                while not self.idle and self.size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.counters['timeouts'] += 1
+                        raise PoolExhaustedError(
+                            f'Все {self.max_size} соединений заняты'
+                        )
+                    self.counters['waits'] += 1
+                    self.condition.wait(remaining)
+                if not self.idle:
+                    self.size += 1
+                    break
+                connection, created_at, released_at = self.idle.pop()
+            if self._usable(connection, created_at, released_at):
+                self.created_at[id(connection)] = created_at
+                self.counters['reused'] += 1
+                return connection
+            self._discard(connection)
+        try:
+            connection = connect()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        self.created_at[id(connection)] = time.monotonic()
+        self.counters['created'] += 1
+        return connection
+
+    def release(self, connection, broken=False):
+        """Возвращает соединение в пул; сломанное закрывается."""
+        created_at = self.created_at.pop(id(connection), 0)
+        if not broken:
+            try:
+                # Незавершенная транзакция не должна достаться
+                # следующему запросу.
+                connection.rollback()
+            except Exception:
+                broken = True
+        if broken or self._expired(created_at):
+            self._discard(connection)
+            return
+        with self.condition:
+            self.idle.append((connection, created_at, time.monotonic()))
+            self.condition.notify()
+
+    def _expired(self, created_at):
+        return time.monotonic() - created_at > self.max_lifetime
+
+    def _usable(self, connection, created_at, released_at):
+        if self._expired(created_at):
+            return False
+        if time.monotonic() - released_at < self.health_check_after:
+            return True
+        self.counters['health_checks'] += 1
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+            cursor.close()
+            connection.rollback()
+        except Exception:
+            self.counters['health_check_failures'] += 1
+            return False
+        return True
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self.condition:
+            self.size -= 1
+            self.counters['discarded'] += 1
+            self.condition.notify()
+
+    def stats(self):
+        with self.condition:
+            return dict(
+                self.counters, size=self.size, idle=len(self.idle),
+                in_use=self.size - len(self.idle), max_size=self.max_size,
+            )
+
+    def clear(self):
+        """Закрывает простаивающие соединения."""
+        with self.condition:
+            idle, self.idle = self.idle, []
+        for connection, _, _ in idle:
+            self._discard(connection)
+
+
+def get_pool(alias, options):
+    """
+    Пул алиаса для текущего процесса.
+    После fork воркер gunicorn заводит свой пул, а не делит сокеты
+    с мастер-процессом.
+    """
+    key = (os.getpid(), alias)
+    with _pools_lock:
+        if key not in _pools:
+            settings = dict(DEFAULTS, **options)
+            _pools[key] = ConnectionPool(
+                settings['MAX_SIZE'], settings['TIMEOUT'],
+                settings['HEALTH_CHECK_AFTER'], settings['MAX_LIFETIME'],
+            )
+        return _pools[key]
+
+
+def get_stats():
+    """Метрики пулов текущего процесса по алиасам."""
+    pid = os.getpid()
+    return {
+        alias: pool.stats()
+        for (owner, alias), pool in list(_pools.items()) if owner == pid
+    }
+
+
+class PooledDatabaseMixin:
+    """Подмешивается к DatabaseWrapper бэкенда Django."""
+
+    def get_pool(self):
+        options = self.settings_dict.get('POOL')
+        if options is None:
+            return None
+        return get_pool(self.alias, options)
+
+    def get_new_connection(self, conn_params):
+        connect = partial(super().get_new_connection, conn_params)
+        pool = self.get_pool()
+        if pool is None:
+            return connect()
+        try:
+            return pool.acquire(connect)
+        except PoolExhaustedError as error:
+            raise self.Database.OperationalError(str(error)) from error
+
+    def _close(self):
+        pool = self.get_pool()
+        if pool is None or self.connection is None:
+            return super()._close()
+        pool.release(self.connection, broken=self.errors_occurred)
+        return None
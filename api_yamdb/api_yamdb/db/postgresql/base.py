@@ -0,0 +1,7 @@
+from django.db.backends.postgresql import base
+
+from ..pool import PooledDatabaseMixin
+
+
+class DatabaseWrapper(PooledDatabaseMixin, base.DatabaseWrapper):
+    """PostgreSQL с пулом соединений процесса."""
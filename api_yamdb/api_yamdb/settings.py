@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 from dotenv import load_dotenv
@@ -37,8 +38,16 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.RequestProfilingMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
 ]
 
+REQUEST_PROFILING = os.getenv('REQUEST_PROFILING', default='') == 'True'
+
+REQUEST_PROFILING_MAX_QUERIES = int(os.getenv('REQUEST_PROFILING_MAX_QUERIES', default=20))
+
+REQUEST_PROFILING_MAX_MS = int(os.getenv('REQUEST_PROFILING_MAX_MS', default=500))
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -72,6 +81,62 @@ DATABASES = {
     }
 }
 
+# Пул соединений на процесс воркера, см. api_yamdb/db/pool.py.
+if os.getenv('DB_POOL', default='') == 'True':
+    DATABASES['default']['ENGINE'] = 'api_yamdb.db.postgresql'
+    DATABASES['default']['POOL'] = {
+        'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', default=4)),
+        'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=10)),
+        'HEALTH_CHECK_AFTER': float(os.getenv('DB_POOL_HEALTH_CHECK_AFTER', default=0)),
+        'MAX_LIFETIME': float(os.getenv('DB_POOL_MAX_LIFETIME', default=1800)),
+    }
+
+# Реплики только для чтения: хосты через запятую, порт и учетные данные
+# как у основной базы. В тестах реплики - зеркала default.
+REPLICA_DATABASES = []
+
+for index, host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(','))):
+    alias = f'replica_{index}'
+    DATABASES[alias] = dict(DATABASES['default'], HOST=host.strip(), TEST={'MIRROR': 'default'})
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', default=10))
+
+REPLICA_PIN_CACHE_ALIAS = 'default'
+
+# Кеш должен быть общим для всех воркеров gunicorn и management-команд:
+# в нем лежат версии кеша ответов, поколения справочников и снимки
+# пользователей. Файловый кеш общий в пределах одного хоста,
+# для нескольких хостов нужен Redis или Memcached.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=os.path.join(tempfile.gettempdir(), 'yamdb_cache')),
+    }
+}
+
+RESPONSE_CACHE_ALIAS = 'default'
+
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', default=300))
+
+CATALOG_CACHE_ALIAS = 'default'
+
+TITLE_BATCH_MAX_SIZE = int(os.getenv('TITLE_BATCH_MAX_SIZE', default=5000))
+
+TITLE_IDS_MAX_SIZE = int(os.getenv('TITLE_IDS_MAX_SIZE', default=200))
+
+CONFIRMATION_CODE_CACHE_ALIAS = 'default'
+
+CONFIRMATION_CODE_TTL = int(os.getenv('CONFIRMATION_CODE_TTL', default=3600))
+
+AUTH_USER_CACHE_ALIAS = 'default'
+
+# Сколько снимок пользователя может отставать от изменений в обход
+# сигналов. 0 выключает снимки.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', default=60))
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -120,7 +185,7 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
 
 }
@@ -136,3 +201,24 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 DEFAULT_FROM_EMAIL = 'webmaster@localhost'
+
+SLOW_REQUEST_LOG = os.getenv('SLOW_REQUEST_LOG', default=os.path.join(BASE_DIR, 'slow_requests.log'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'slow_requests': {
+            'class': 'logging.FileHandler',
+            'filename': SLOW_REQUEST_LOG,
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'api.slow_requests': {
+            'handlers': ['slow_requests'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
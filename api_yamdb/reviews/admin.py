@@ -9,8 +9,11 @@ class TitleAdmin(admin.ModelAdmin):
         'name',
         'year',
         'category',
+        'rating',
+        'review_count',
         'description',
     )
+    readonly_fields = ('rating', 'rating_sum', 'review_count')
     search_fields = ('name',)
     list_filter = ('name',)
     empty_value_display = '-пусто-'
@@ -0,0 +1,102 @@
+"""
+Массовая запись строк в обход ORM-сигналов.
+На PostgreSQL строки пишутся через COPY, на остальных базах - пачкой INSERT.
+"""
+import io
+
+from django.core.management.color import no_style
+from django.db import connections
+
+
+def can_copy(using):
+    return connections[using].vendor == 'postgresql'
+
+
+def _prepare(model, objs, connection):
+    """
+    Готовит значения колонок так же, как INSERT через ORM,
+    но не затирает уже заданные поля auto_now_add (даты из выгрузки).
+    """
+    has_pk = objs[0].pk is not None
+    if any((obj.pk is not None) != has_pk for obj in objs):
+        raise ValueError(
+            f'{model.__name__}: id задан только у части строк пачки'
+        )
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not (field.primary_key and not has_pk)
+    ]
+    rows = []
+    for obj in objs:
+        row = []
+        for field in fields:
+            value = getattr(obj, field.attname)
+            if value is None or not getattr(field, 'auto_now_add', False):
+                value = field.pre_save(obj, add=True)
+            row.append(field.get_db_prep_save(value, connection))
+        rows.append(row)
+    return [field.column for field in fields], rows
+
+
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r',
+})
+
+
+def _copy_value(value):
+    """Значение в текстовом формате COPY: NULL - это \\N."""
+    if value is None:
+        return '\\N'
+    return str(value).translate(COPY_ESCAPES)
+
+
+def _copy(connection, table, columns, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(map(_copy_value, row)))
+        buffer.write('\n')
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f'COPY {table} ({columns}) FROM STDIN', buffer)
+
+
+def _insert(connection, table, columns, rows):
+    placeholders = ', '.join(['%s'] * len(rows[0]))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} ({columns}) VALUES ({placeholders})', rows
+        )
+
+
+def write_rows(model, columns, rows, using, use_copy=True):
+    """
+    Записывает готовые строки одной командой COPY или INSERT.
+    Значения должны быть уже в формате базы.
+    """
+    if not rows:
+        return
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    write = _copy if use_copy and can_copy(using) else _insert
+    write(
+        connection, quote(model._meta.db_table),
+        ', '.join(quote(column) for column in columns), rows
+    )
+
+
+def write_objects(model, objs, using, use_copy=True):
+    """Записывает несохраненные объекты одной командой COPY или INSERT."""
+    if not objs:
+        return
+    columns, rows = _prepare(model, objs, connections[using])
+    write_rows(model, columns, rows, using, use_copy)
+
+
+def reset_sequences(models, using):
+    """Сдвигает последовательности id после вставки с явными ключами."""
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
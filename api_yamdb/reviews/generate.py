@@ -0,0 +1,273 @@
+"""
+Генерация синтетических данных для нагрузочных тестов.
+Строки собираются пачками и пишутся через reviews.bulk (COPY или INSERT).
+Одинаковые seed и now дают одинаковые данные при любом числе процессов:
+id отзывов и комментариев распределяются по задачам заранее.
+"""
+import multiprocessing
+import random
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from django.db import connections, transaction
+from django.utils import timezone
+from users.models import User
+
+from .bulk import reset_sequences, write_objects, write_rows
+from .models import Category, Comment, Genre, Review, Title
+
+GenreTitle = Title.genre.through
+
+SCORES = range(1, 11)
+# Оценки смещены к 7-9, как на живых сайтах с отзывами.
+SCORE_WEIGHTS = (2, 1, 2, 3, 5, 8, 12, 14, 10, 6)
+
+REVIEW_COLUMNS = ('id', 'text', 'title_id', 'score', 'author_id', 'pub_date')
+COMMENT_COLUMNS = ('id', 'text', 'review_id', 'author_id', 'pub_date')
+
+# Отзывы разбросаны по последним трем годам, комментарии - по месяцу
+# после отзыва.
+REVIEW_PERIOD = 3 * 365 * 24 * 3600
+COMMENT_PERIOD = 30 * 24 * 3600
+
+# От этого момента отсчитываются даты, если now не задан.
+DEFAULT_NOW = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+Chunk = namedtuple('Chunk', (
+    'index', 'seed', 'first_title_id', 'counts', 'first_review_id',
+    'first_comment_id', 'first_user_id', 'users', 'comments_per_review',
+    'now', 'batch_size', 'using', 'use_copy',
+))
+
+
+def _next_id(model, using):
+    last = (
+        model.objects.using(using).order_by('-pk')
+        .values_list('pk', flat=True).first()
+    )
+    return (last or 0) + 1
+
+
+def _write(model, columns, rows, using, use_copy):
+    with transaction.atomic(using=using):
+        write_rows(model, columns, rows, using, use_copy)
+
+
+def review_counts(titles, users, reviews, skew, rng):
+    """
+    Число отзывов на каждое произведение по закону Ципфа:
+    немногие популярные произведения собирают большую часть отзывов.
+    Больше отзывов, чем пользователей, у произведения быть не может;
+    излишек распределяется между остальными произведениями.
+    """
+    weights = [1 / (rank + 1) ** skew for rank in range(titles)]
+    rng.shuffle(weights)
+    counts = [0] * titles
+    remaining = min(reviews, titles * users)
+    candidates = list(range(titles))
+    while remaining > 0 and candidates:
+        total = sum(weights[i] for i in candidates)
+        expected = {i: remaining * weights[i] / total for i in candidates}
+        shares = {i: int(value) for i, value in expected.items()}
+        # Остаток от округления вниз получают наибольшие дробные части.
+        leftover = remaining - sum(shares.values())
+        for i in sorted(
+            candidates, key=lambda i: shares[i] - expected[i]
+        )[:leftover]:
+            shares[i] += 1
+        not_full = []
+        for i in candidates:
+            room = users - counts[i]
+            if shares[i] < room:
+                not_full.append(i)
+            counts[i] += min(shares[i], room)
+            remaining -= min(shares[i], room)
+        candidates = not_full
+    return counts
+
+
+def comment_counts(chunk):
+    """
+    Число комментариев к каждому отзыву среза.
+    Свой генератор случайных чисел позволяет посчитать их до записи
+    и выдать задачам непересекающиеся диапазоны id.
+    """
+    reviews = sum(chunk.counts)
+    if not chunk.comments_per_review:
+        return [0] * reviews
+    rng = random.Random(f'{chunk.seed}:{chunk.index}:comments')
+    rate = 1 / chunk.comments_per_review
+    return [round(rng.expovariate(rate)) for _ in range(reviews)]
+
+
+def fill_chunk(chunk):
+    """
+    Создает отзывы и комментарии для среза произведений.
+    Авторы отзыва выбираются без возвращения, поэтому пара
+    (произведение, автор) уникальна без повторных попыток.
+    Возвращает число записанных отзывов и комментариев.
+    """
+    rng = random.Random(f'{chunk.seed}:{chunk.index}')
+    adapt = connections[chunk.using].ops.adapt_datetimefield_value
+    reviews, comments = [], []
+    written = [0, 0]
+    review_id = chunk.first_review_id
+    comment_id = chunk.first_comment_id
+    replies = iter(comment_counts(chunk))
+
+    def flush_reviews():
+        _write(Review, REVIEW_COLUMNS, reviews, chunk.using, chunk.use_copy)
+        written[0] += len(reviews)
+        reviews.clear()
+
+    def flush_comments():
+        flush_reviews()
+        _write(
+            Comment, COMMENT_COLUMNS, comments, chunk.using, chunk.use_copy
+        )
+        written[1] += len(comments)
+        comments.clear()
+
+    for offset, count in enumerate(chunk.counts):
+        title_id = chunk.first_title_id + offset
+        authors = rng.sample(range(chunk.users), count)
+        scores = rng.choices(SCORES, SCORE_WEIGHTS, k=count)
+        for author, score in zip(authors, scores):
+            pub_date = chunk.now - timedelta(
+                seconds=rng.randrange(REVIEW_PERIOD)
+            )
+            reviews.append((
+                review_id, f'Отзыв {review_id}', title_id, score,
+                chunk.first_user_id + author, adapt(pub_date),
+            ))
+            for _ in range(next(replies)):
+                comments.append((
+                    comment_id, f'Комментарий к отзыву {review_id}',
+                    review_id,
+                    chunk.first_user_id + rng.randrange(chunk.users),
+                    adapt(pub_date + timedelta(
+                        seconds=rng.randrange(COMMENT_PERIOD)
+                    )),
+                ))
+                comment_id += 1
+            review_id += 1
+        if len(comments) >= chunk.batch_size:
+            flush_comments()
+        elif len(reviews) >= chunk.batch_size:
+            flush_reviews()
+    flush_comments()
+    return tuple(written)
+
+
+def _batches(total, batch_size):
+    for start in range(0, total, batch_size):
+        yield start, min(batch_size, total - start)
+
+
+def generate(titles, users, genres, categories, reviews,
+             comments_per_review, skew=1.0, seed=1, batch_size=10000,
+             workers=1, chunk_titles=1000, using='default', use_copy=True,
+             now=DEFAULT_NOW, progress=None):
+    """
+    Создает справочники, пользователей, произведения, отзывы
+    и комментарии. Даты отсчитываются назад от now.
+    Возвращает {модель: число строк} и время работы.
+    """
+    started = time.monotonic()
+    rng = random.Random(seed)
+    created = {}
+
+    first_category_id = _next_id(Category, using)
+    category_ids = range(first_category_id, first_category_id + categories)
+    write_objects(Category, [
+        Category(id=pk, name=f'Категория {pk}', slug=f'gen-category-{pk}')
+        for pk in category_ids
+    ], using, use_copy)
+    first_genre_id = _next_id(Genre, using)
+    genre_ids = range(first_genre_id, first_genre_id + genres)
+    write_objects(Genre, [
+        Genre(id=pk, name=f'Жанр {pk}', slug=f'gen-genre-{pk}')
+        for pk in genre_ids
+    ], using, use_copy)
+    created[Category] = categories
+    created[Genre] = genres
+
+    first_user_id = _next_id(User, using)
+    for start, size in _batches(users, batch_size):
+        with transaction.atomic(using=using):
+            write_objects(User, [
+                User(
+                    id=pk, username=f'gen_user{pk}',
+                    email=f'gen_user{pk}@yamdb.fake', password='!',
+                    date_joined=now,
+                )
+                for pk in range(
+                    first_user_id + start, first_user_id + start + size
+                )
+            ], using, use_copy)
+    created[User] = users
+
+    first_title_id = _next_id(Title, using)
+    created[GenreTitle] = 0
+    for start, size in _batches(titles, batch_size):
+        title_objs, links = [], []
+        for pk in range(first_title_id + start, first_title_id + start + size):
+            title_objs.append(Title(
+                id=pk, name=f'Произведение {pk}',
+                year=rng.randint(1900, 2022), description='',
+                category_id=rng.choice(category_ids) if categories else None,
+            ))
+            links.extend(
+                GenreTitle(title_id=pk, genre_id=genre_id)
+                for genre_id in rng.sample(
+                    genre_ids, rng.randint(min(1, genres), min(3, genres))
+                )
+            )
+        with transaction.atomic(using=using):
+            write_objects(Title, title_objs, using, use_copy)
+            write_objects(GenreTitle, links, using, use_copy)
+        created[GenreTitle] += len(links)
+    created[Title] = titles
+
+    counts = review_counts(titles, users, reviews, skew, rng)
+    chunks = []
+    first_review_id = _next_id(Review, using)
+    first_comment_id = _next_id(Comment, using)
+    for index, (start, size) in enumerate(_batches(titles, chunk_titles)):
+        part = counts[start:start + size]
+        chunk = Chunk(
+            index, seed, first_title_id + start, part, first_review_id,
+            first_comment_id, first_user_id, users, comments_per_review,
+            now, batch_size, using, use_copy,
+        )
+        chunks.append(chunk)
+        first_review_id += sum(part)
+        first_comment_id += sum(comment_counts(chunk))
+
+    created[Review] = created[Comment] = 0
+    if workers > 1:
+        # Дочерние процессы открывают свои соединения.
+        connections.close_all()
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            results = pool.imap_unordered(fill_chunk, chunks)
+            for done, (review_rows, comment_rows) in enumerate(results, 1):
+                created[Review] += review_rows
+                created[Comment] += comment_rows
+                if progress:
+                    progress(done, len(chunks), created)
+    else:
+        for done, chunk in enumerate(chunks, 1):
+            review_rows, comment_rows = fill_chunk(chunk)
+            created[Review] += review_rows
+            created[Comment] += comment_rows
+            if progress:
+                progress(done, len(chunks), created)
+
+    reset_sequences(
+        [Category, Genre, User, Title, Review, Comment], using
+    )
+    Title.objects.using(using).filter(
+        pk__gte=first_title_id
+    ).recalculate_rating()
+    return created, time.monotonic() - started
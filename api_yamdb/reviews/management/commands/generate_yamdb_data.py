@@ -0,0 +1,102 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from reviews.generate import DEFAULT_NOW, generate
+from reviews.models import Comment, Review
+from reviews.signals import bulk_loaded
+
+
+def moment(value):
+    """Дата или дата со временем в ISO 8601; без зоны считается UTC."""
+    value = datetime.fromisoformat(value)
+    if timezone.is_aware(value):
+        return value
+    return timezone.make_aware(value, timezone.utc)
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетические данные для нагрузочных тестов: '
+        'популярные произведения получают большую часть отзывов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument(
+            '--reviews', type=int, default=10000,
+            help='Сколько отзывов создать всего.'
+        )
+        parser.add_argument(
+            '--comments-per-review', type=float, default=2,
+            help='Среднее число комментариев к отзыву.'
+        )
+        parser.add_argument(
+            '--skew', type=float, default=1.0,
+            help='Показатель закона Ципфа для популярности произведений.'
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--now', type=moment, default=DEFAULT_NOW,
+            help='Момент, от которого назад отсчитываются даты '
+                 '(ISO 8601, по умолчанию 2022-01-01).'
+        )
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Число процессов, пишущих отзывы и комментарии.'
+        )
+        parser.add_argument(
+            '--chunk-titles', type=int, default=1000,
+            help='Сколько произведений обрабатывает одна задача.'
+        )
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Писать INSERT вместо COPY даже на PostgreSQL.'
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if min(options['titles'], options['users'], options['batch_size'],
+               options['workers'], options['chunk_titles']) < 1:
+            raise CommandError(
+                'titles, users, batch-size, workers и chunk-titles '
+                'должны быть положительными.'
+            )
+        self.verbosity = options['verbosity']
+        created, elapsed = generate(
+            titles=options['titles'],
+            users=options['users'],
+            genres=options['genres'],
+            categories=options['categories'],
+            reviews=options['reviews'],
+            comments_per_review=options['comments_per_review'],
+            skew=options['skew'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            chunk_titles=options['chunk_titles'],
+            using=options['database'],
+            use_copy=not options['no_copy'],
+            now=options['now'],
+            progress=self.progress,
+        )
+        for model, rows in created.items():
+            self.stdout.write(f'{model._meta.db_table}: {rows}')
+        total = sum(created.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано {total} строк за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-6):.0f} строк/с)'
+        ))
+        bulk_loaded.send(sender=self.__class__, models=list(created))
+
+    def progress(self, done, total, created):
+        if self.verbosity > 1:
+            self.stdout.write(
+                f'Задача {done}/{total}: отзывов {created[Review]}, '
+                f'комментариев {created[Comment]}'
+            )
@@ -0,0 +1,53 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:44
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    scores = (
+        Review.objects.filter(title=OuterRef('pk'), score__isnull=False)
+        .order_by().values('title')
+    )
+    Title.objects.update(
+        rating_sum=Coalesce(
+            Subquery(scores.annotate(value=Sum('score')).values('value')), 0
+        ),
+        review_count=Coalesce(
+            Subquery(scores.annotate(value=Count('score')).values('value')), 0
+        ),
+        rating=Subquery(
+            scores.annotate(
+                value=Sum('score') / Count('score')
+            ).values('value')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_auto_20220809_1456'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.IntegerField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
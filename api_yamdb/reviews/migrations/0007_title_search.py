@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:20
+
+from django.db import migrations
+
+from reviews import search
+
+
+def install(apps, schema_editor):
+    search.install(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
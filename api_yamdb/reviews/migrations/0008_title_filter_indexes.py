@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year'], name='title_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'year'], name='title_category_year_idx'),
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX genre_title_genre_title_idx '
+            'ON genre_title (genre_id, title_id)',
+            'DROP INDEX genre_title_genre_title_idx',
+        ),
+    ]
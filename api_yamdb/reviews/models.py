@@ -1,6 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
 
 from .validators import year_validation
 
@@ -31,8 +34,56 @@ class Genre(Parent):
     pass
 
 
+class TitleQuerySet(models.QuerySet):
+    """Операции над хранимым рейтингом произведений."""
+
+    def touch(self):
+        """Отмечает произведения измененными для условных GET-запросов."""
+        return self.update(updated_at=timezone.now())
+
+    def shift_rating(self, score_delta, count_delta):
+        """
+        Атомарно сдвигает сумму оценок и число отзывов.
+        Рейтинг пересчитывается в том же UPDATE без чтения строки.
+        """
+        return self.update(
+            updated_at=timezone.now(),
+            rating_sum=F('rating_sum') + score_delta,
+            review_count=F('review_count') + count_delta,
+            rating=(
+                (F('rating_sum') + score_delta)
+                / NullIf(F('review_count') + count_delta, 0)
+            ),
+        )
+
+    def recalculate_rating(self):
+        """
+        Пересчитывает рейтинг по таблице отзывов.
+        Нужен для массовых операций, которые обходят сигналы.
+        """
+        scores = (
+            Review.objects.filter(title=OuterRef('pk'), score__isnull=False)
+            .order_by().values('title')
+        )
+        score_sum = scores.annotate(value=Sum('score')).values('value')
+        score_count = scores.annotate(value=Count('score')).values('value')
+        return self.update(
+            updated_at=timezone.now(),
+            rating_sum=Coalesce(Subquery(score_sum), 0),
+            review_count=Coalesce(Subquery(score_count), 0),
+            rating=Subquery(
+                scores.annotate(
+                    value=Sum('score') / Count('score')
+                ).values('value')
+            ),
+        )
+
+
 class Title(models.Model):
-    """Модель произведения."""
+    """
+    Модель произведения.
+    Рейтинг хранится в самой записи и обновляется при изменении отзывов.
+    """
     name = models.CharField(max_length=250)
     year = models.IntegerField(validators=[year_validation])
     description = models.TextField(blank=True)
@@ -47,9 +98,22 @@ class Title(models.Model):
         related_name='titles',
         db_table='genre_title'
     )
+    rating = models.IntegerField(null=True, editable=False, db_index=True)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ('year',)
+        indexes = [
+            models.Index(fields=['year'], name='title_year_idx'),
+            models.Index(
+                fields=['category', 'year'],
+                name='title_category_year_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name[:LIM]
@@ -83,10 +147,33 @@ class Review(models.Model):
                 name='unique_title_author'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:LIM]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_rating_state()
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Пересчет рейтинга в post_save идет в одной транзакции с записью.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    def remember_rating_state(self):
+        """Запоминает сохраненные произведение и оценку отзыва."""
+        self._saved_rating_state = (
+            self.__dict__.get('title_id'), self.__dict__.get('score')
+        )
+
 
 class Comment(models.Model):
     """Модель  комментариев к отзывам о произведениях."""
@@ -106,6 +193,12 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('pub_date', )
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:LIM]
@@ -0,0 +1,150 @@
+"""
+Полнотекстовый поиск произведений.
+
+PostgreSQL 12+: генерируемая колонка tsvector и триграммы по названию,
+обе под GIN-индексами. SQLite: внешняя таблица FTS5 с триггерами,
+чтобы локальный запуск обходился без PostgreSQL.
+"""
+from django.db import connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+TABLE = 'reviews_title'
+FTS_TABLE = 'reviews_title_fts'
+PG_CONFIG = 'simple'
+
+POSTGRESQL_INSTALL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    f"""ALTER TABLE {TABLE} ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{PG_CONFIG}', coalesce(name, '')), 'A')
+            || setweight(
+                to_tsvector('{PG_CONFIG}', coalesce(description, '')), 'B'
+            )
+        ) STORED""",
+    f'CREATE INDEX title_search_vector_idx ON {TABLE} '
+    f'USING gin (search_vector)',
+    f'CREATE INDEX title_name_trgm_idx ON {TABLE} '
+    f'USING gin (name gin_trgm_ops)',
+)
+
+POSTGRESQL_UNINSTALL = (
+    'DROP INDEX IF EXISTS title_name_trgm_idx',
+    'DROP INDEX IF EXISTS title_search_vector_idx',
+    f'ALTER TABLE {TABLE} DROP COLUMN IF EXISTS search_vector',
+)
+
+SQLITE_INSTALL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description, content='{TABLE}', content_rowid='id'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+        AFTER INSERT ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+        AFTER DELETE ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+        AFTER UPDATE OF name, description ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO {FTS_TABLE}(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+
+SQLITE_UNINSTALL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def _execute(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def install(connection):
+    if connection.vendor == 'postgresql':
+        _execute(connection, POSTGRESQL_INSTALL)
+    elif connection.vendor == 'sqlite':
+        _execute(connection, SQLITE_INSTALL)
+
+
+def uninstall(connection):
+    if connection.vendor == 'postgresql':
+        _execute(connection, POSTGRESQL_UNINSTALL)
+    elif connection.vendor == 'sqlite':
+        _execute(connection, SQLITE_UNINSTALL)
+
+
+def ensure_sqlite_index(using, **kwargs):
+    """
+    Обработчик post_migrate.
+    SQLite пересоздает таблицу при изменении схемы и теряет триггеры,
+    поэтому после каждой миграции они восстанавливаются.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    tables = connection.introspection.table_names()
+    if TABLE in tables and FTS_TABLE in tables:
+        _execute(connection, SQLITE_INSTALL)
+
+
+def _fts5_query(query):
+    return ' '.join(
+        '"{}"*'.format(word.replace('"', '""')) for word in query.split()
+    )
+
+
+def search_titles(queryset, query):
+    """
+    Отбирает произведения по поисковой строке и сортирует по релевантности.
+    Релевантность доступна в аннотации search_rank.
+    """
+    query = query.strip()
+    if not query:
+        return queryset
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        ts_query = f"plainto_tsquery('{PG_CONFIG}', %s)"
+        queryset = queryset.extra(
+            where=[
+                f'({TABLE}.search_vector @@ {ts_query} '
+                f'OR {TABLE}.name %% %s)'
+            ],
+            params=[query, query],
+        ).annotate(search_rank=RawSQL(
+            f'GREATEST(ts_rank({TABLE}.search_vector, {ts_query}), '
+            f'similarity({TABLE}.name, %s))',
+            (query, query), output_field=FloatField()
+        ))
+    elif vendor == 'sqlite':
+        match = _fts5_query(query)
+        # pk__in=RawSQL(...) дает в SQLite "IN ((SELECT ...))", то есть
+        # сравнение только с первой строкой, поэтому условие через extra.
+        queryset = queryset.extra(
+            where=[
+                f'{TABLE}.id IN (SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s)'
+            ],
+            params=[match],
+        ).annotate(search_rank=RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {TABLE}.id',
+            (match,), output_field=FloatField()
+        ))
+    else:
+        return queryset.filter(
+            Q(name__icontains=query) | Q(description__icontains=query)
+        )
+    return queryset.order_by('-search_rank', 'pk')
@@ -0,0 +1,134 @@
+import threading
+
+from django.db.models import Q
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import Signal, receiver
+
+from .models import Category, Comment, Genre, Review, Title, User
+
+# Отправляется после массовой загрузки, которая обходит сигналы моделей.
+bulk_loaded = Signal(providing_args=['models'])
+
+_deleting = threading.local()
+
+
+def _being_deleted(model):
+    """
+    id объектов model, удаление которых идет в этом потоке.
+    Каскад сначала шлет pre_delete всем объектам, затем post_delete
+    зависимым моделям и только потом родителям.
+    """
+    return _deleting.__dict__.setdefault(model, set())
+
+
+def _shift(title_id, score, sign):
+    if title_id is None:
+        return
+    titles = Title.objects.filter(pk=title_id)
+    if score is None:
+        titles.touch()
+    else:
+        titles.shift_rating(sign * score, sign)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, **kwargs):
+    """Переносит оценку отзыва в рейтинг произведения."""
+    if raw:
+        return
+    old_title_id, old_score = getattr(
+        instance, '_saved_rating_state', (None, None)
+    )
+    if created:
+        old_title_id, old_score = None, None
+    if old_title_id == instance.title_id and old_score is not None:
+        titles = Title.objects.filter(pk=instance.title_id)
+        if instance.score is None:
+            titles.shift_rating(-old_score, -1)
+        else:
+            titles.shift_rating(instance.score - old_score, 0)
+    elif old_title_id == instance.title_id:
+        _shift(instance.title_id, instance.score, 1)
+    else:
+        _shift(old_title_id, old_score, -1)
+        _shift(instance.title_id, instance.score, 1)
+    instance.remember_rating_state()
+
+
+@receiver(pre_delete, sender=Review)
+@receiver(pre_delete, sender=Title)
+def mark_deleted(sender, instance, **kwargs):
+    _being_deleted(sender).add(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+def unmark_deleted_title(sender, instance, **kwargs):
+    _being_deleted(Title).discard(instance.pk)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Убирает оценку удаленного отзыва из рейтинга произведения."""
+    _being_deleted(Review).discard(instance.pk)
+    title_id, score = getattr(
+        instance, '_saved_rating_state', (instance.title_id, instance.score)
+    )
+    # Рейтинг удаляемого вместе с отзывами произведения не нужен.
+    if title_id not in _being_deleted(Title):
+        _shift(title_id, score, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_title_on_comment(sender, instance, raw=False, **kwargs):
+    """
+    Комментарии меняют ленту отзывов, а значит и валидаторы произведения.
+    При удалении отзыва произведение один раз трогает сам отзыв.
+    """
+    if raw or instance.review_id in _being_deleted(Review):
+        return
+    Title.objects.filter(title_reviews=instance.review_id).touch()
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_titles_of_category(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Title.objects.filter(category=instance).touch()
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_titles_of_genre(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Title.objects.filter(genre=instance).touch()
+
+
+@receiver(post_save, sender=User)
+def touch_titles_of_author(sender, instance, created, raw, **kwargs):
+    """
+    Имя автора выводится в отзывах и комментариях произведений.
+    Трогает произведения только при переименовании; два подзапроса
+    по индексам авторов вместо OR поверх соединения таблиц.
+    """
+    saved = getattr(instance, '_saved_username', None)
+    if created or raw or saved is None or saved == instance.username:
+        return
+    Title.objects.filter(
+        Q(pk__in=Review.objects.filter(author=instance).values('title_id'))
+        | Q(pk__in=Comment.objects.filter(
+            author=instance
+        ).values('review__title_id'))
+    ).touch()
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_title_on_genres(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        Title.objects.filter(pk__in=pk_set or ()).touch()
+    else:
+        Title.objects.filter(pk=instance.pk).touch()
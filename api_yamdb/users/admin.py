@@ -1,5 +1,22 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutboxEmail, User
 
 admin.site.register(User)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'recipient',
+        'subject',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'sent_at',
+    )
+    search_fields = ('recipient',)
+    list_filter = ('status',)
+    # В тексте письма лежит код подтверждения.
+    exclude = ('body',)
+    empty_value_display = '-пусто-'
@@ -0,0 +1,115 @@
+import hashlib
+import hmac
+import time
+from datetime import timedelta
+from secrets import token_hex
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from .models import User
+
+KEY_PREFIX = 'confirmation-code'
+CODE_BYTES = 16
+
+
+def get_cache():
+    return caches[settings.CONFIRMATION_CODE_CACHE_ALIAS]
+
+
+def _key(username):
+    return f'{KEY_PREFIX}:{username}'
+
+
+def digest(username, code):
+    """HMAC кода: в базе и кеше хранится только он."""
+    return hmac.new(
+        settings.SECRET_KEY.encode(), f'{username}:{code}'.encode(),
+        hashlib.sha256
+    ).hexdigest()
+
+
+def remember(user_id, username, code_digest, expires):
+    """Кладет код в кеш ровно на оставшееся время его жизни."""
+    timeout = int(expires.timestamp() - time.time())
+    if timeout > 0:
+        get_cache().set(_key(username), {
+            'id': user_id,
+            'digest': code_digest,
+            'expires': expires.timestamp(),
+        }, timeout)
+
+
+def forget(username):
+    get_cache().delete(_key(username))
+
+
+def issue(user):
+    """
+    Выпускает новый код для пользователя и возвращает его.
+    Новый пользователь сохраняется вместе с кодом одним INSERT,
+    существующему код обновляется одним UPDATE.
+    """
+    code = token_hex(CODE_BYTES)
+    user.confirmation_code = digest(user.username, code)
+    user.confirmation_code_expires = timezone.now() + timedelta(
+        seconds=settings.CONFIRMATION_CODE_TTL
+    )
+    if user.pk is None:
+        user.save()
+    else:
+        User.objects.filter(pk=user.pk).update(
+            confirmation_code=user.confirmation_code,
+            confirmation_code_expires=user.confirmation_code_expires,
+        )
+    remember(
+        user.pk, user.username, user.confirmation_code,
+        user.confirmation_code_expires
+    )
+    return code
+
+
+def check(username, code):
+    """
+    Возвращает id пользователя, если код верен и не истек, иначе None.
+    Обычно обходится без запроса к базе; при промахе кеша читает одну
+    строку и прогревает кеш. Если пользователя нет - User.DoesNotExist.
+    """
+    entry = get_cache().get(_key(username))
+    if entry is None:
+        row = User.objects.filter(username=username).values_list(
+            'id', 'confirmation_code', 'confirmation_code_expires'
+        ).first()
+        if row is None:
+            raise User.DoesNotExist
+        user_id, code_digest, expires = row
+        if not code_digest or expires is None:
+            return None
+        remember(user_id, username, code_digest, expires)
+        entry = {
+            'id': user_id,
+            'digest': code_digest,
+            'expires': expires.timestamp(),
+        }
+    if entry['expires'] <= time.time():
+        return None
+    if not hmac.compare_digest(entry['digest'], digest(username, code)):
+        return None
+    return entry['id']
+
+
+def redeem(username, code):
+    """
+    Как check, но код одноразовый: после выдачи токена он стирается
+    из базы и кеша. Из двух одновременных запросов с одним кодом
+    пройдет только тот, чей условный UPDATE изменил строку.
+    """
+    user_id = check(username, code)
+    if user_id is None:
+        return None
+    used = User.objects.filter(
+        pk=user_id, confirmation_code=digest(username, code)
+    ).update(confirmation_code='', confirmation_code_expires=None)
+    forget(username)
+    return user_id if used else None
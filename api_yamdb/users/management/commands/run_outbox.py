@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from users.outbox import claim, deliver
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди пачками с повторами при ошибках.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--interval', type=float, default=2,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument('--max-attempts', type=int, default=8)
+        parser.add_argument(
+            '--retry-delay', type=float, default=30,
+            help='Пауза перед первым повтором, дальше она удваивается.'
+        )
+        parser.add_argument('--max-retry-delay', type=float, default=3600)
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать одну пачку и выйти.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            emails = claim(options['batch_size'])
+            if emails:
+                sent = deliver(
+                    emails, options['max_attempts'],
+                    options['retry_delay'], options['max_retry_delay']
+                )
+                self.stdout.write(f'Отправлено {sent} из {len(emails)}')
+            if options['once']:
+                return
+            if not emails:
+                time.sleep(options['interval'])
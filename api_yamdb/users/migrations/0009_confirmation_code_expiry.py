@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='confirmation_code_expires',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='confirmation code expires'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='confirmation_code',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='confirmation_code'),
+        ),
+    ]
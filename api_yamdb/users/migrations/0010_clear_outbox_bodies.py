@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def clear_bodies(apps, schema_editor):
+    """Убирает коды подтверждения из уже обработанных писем."""
+    OutboxEmail = apps.get_model('users', 'OutboxEmail')
+    OutboxEmail.objects.exclude(status='pending').update(body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_confirmation_code_expiry'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_bodies, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from reviews.validators import username_validation
 
 USER = 'user'
@@ -42,7 +43,12 @@ class User(AbstractUser):
         choices=ROLE_CHOICES,
         default=USER
     )
-    confirmation_code = models.CharField('confirmation_code', max_length=16)
+    confirmation_code = models.CharField(
+        'confirmation_code', max_length=64, blank=True, editable=False
+    )
+    confirmation_code_expires = models.DateTimeField(
+        'confirmation code expires', null=True, blank=True, editable=False
+    )
 
     class Meta:
         ordering = ('id',)
@@ -63,3 +69,59 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_username()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.remember_username()
+
+    def remember_username(self):
+        """Запоминает сохраненное имя: по нему сигналы видят переименование."""
+        self._saved_username = self.__dict__.get('username')
+
+
+class OutboxEmail(models.Model):
+    """
+    Письмо в очереди на отправку.
+    Запрос только сохраняет запись, отправляет ее команда run_outbox.
+    """
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, PENDING),
+        (SENT, SENT),
+        (FAILED, FAILED),
+    )
+
+    subject = models.CharField('subject', max_length=255)
+    body = models.TextField('body')
+    from_email = models.CharField('from', max_length=254)
+    recipient = models.EmailField('recipient')
+    status = models.CharField(
+        'status', max_length=7, choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('attempts', default=0)
+    next_attempt_at = models.DateTimeField(
+        'next attempt', default=timezone.now
+    )
+    last_error = models.TextField('last error', blank=True)
+    created_at = models.DateTimeField('created', auto_now_add=True)
+    sent_at = models.DateTimeField('sent', null=True, blank=True)
+
+    class Meta:
+        ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outbox_due_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
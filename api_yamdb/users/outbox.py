@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+# Сколько письмо остается за воркером, прежде чем его сможет взять другой.
+LEASE = timedelta(minutes=5)
+
+
+def enqueue(subject, body, from_email, recipient):
+    """Ставит письмо в очередь одной вставкой."""
+    return OutboxEmail.objects.create(
+        subject=subject, body=body, from_email=from_email,
+        recipient=recipient
+    )
+
+
+def backoff(attempts, base, cap):
+    """Экспоненциальная пауза перед следующей попыткой."""
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), cap))
+
+
+def claim(batch_size):
+    """
+    Забирает пачку писем, которым пора уходить, и продлевает их аренду.
+    Параллельные воркеры на PostgreSQL пропускают уже занятые строки.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = OutboxEmail.objects.filter(
+            status=OutboxEmail.PENDING, next_attempt_at__lte=now
+        ).order_by('next_attempt_at')
+        features = transaction.get_connection().features
+        if features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        emails = list(due[:batch_size])
+        OutboxEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(next_attempt_at=now + LEASE)
+    return emails
+
+
+def deliver(emails, max_attempts, base_delay, max_delay):
+    """
+    Отправляет пачку через одно SMTP-соединение.
+    Неудачные письма откладываются с нарастающей паузой,
+    после max_attempts попыток помечаются как failed.
+    Возвращает число отправленных писем.
+    """
+    sent, errors = [], {}
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for email in emails:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email,
+                [email.recipient], connection=connection
+            )
+            try:
+                message.send()
+            except Exception as error:
+                errors[email] = error
+            else:
+                sent.append(email.pk)
+    except Exception as error:
+        errors.update(
+            (email, error) for email in emails
+            if email.pk not in sent and email not in errors
+        )
+    finally:
+        connection.close()
+
+    now = timezone.now()
+    # Текст письма содержит код подтверждения в открытом виде:
+    # после отправки или последней попытки он больше не хранится.
+    OutboxEmail.objects.filter(pk__in=sent).update(
+        status=OutboxEmail.SENT, sent_at=now, last_error='', body=''
+    )
+    for email, error in errors.items():
+        email.attempts += 1
+        email.last_error = repr(error)
+        if email.attempts >= max_attempts:
+            email.status = OutboxEmail.FAILED
+            email.body = ''
+        email.next_attempt_at = now + backoff(
+            email.attempts, base_delay, max_delay
+        )
+        email.save(update_fields=(
+            'attempts', 'last_error', 'status', 'next_attempt_at', 'body'
+        ))
+    return len(sent)
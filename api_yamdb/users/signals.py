@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import codes, snapshots
+from .models import User
+
+
+@receiver(post_delete, sender=User)
+def forget_confirmation_code(sender, instance, **kwargs):
+    """Код удаленного пользователя больше не выдает токены."""
+    codes.forget(instance.username)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_snapshot(sender, instance, **kwargs):
+    """Смена роли или удаление сразу видны в следующем запросе."""
+    snapshots.forget(instance.pk)
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+
+from api_yamdb.cache import is_shared
+
+from .models import User
+
+KEY_PREFIX = 'user-snapshot'
+
+# Поля, которых достаточно для прав доступа и /users/me/.
+# Пароль и код подтверждения в кеш не попадают.
+# Порядок полей как в модели: этого требует Model.from_db().
+FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in {
+        'id', 'username', 'email', 'first_name', 'last_name', 'bio',
+        'role', 'is_staff', 'is_superuser', 'is_active',
+    }
+)
+
+
+def get_cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def enabled():
+    """
+    Снимки включены только на общем кеше: forget() после смены роли
+    или блокировки должны увидеть все воркеры. Даже так снимок живет
+    не дольше AUTH_USER_CACHE_TIMEOUT, если пользователя изменили
+    в обход сигналов (update(), другой сервис).
+    """
+    return (
+        settings.AUTH_USER_CACHE_TIMEOUT > 0
+        and is_shared(settings.AUTH_USER_CACHE_ALIAS)
+    )
+
+
+def _key(user_id):
+    return f'{KEY_PREFIX}:{user_id}'
+
+
+def remember(user):
+    get_cache().set(
+        _key(user.pk),
+        [getattr(user, field) for field in FIELDS],
+        settings.AUTH_USER_CACHE_TIMEOUT,
+    )
+
+
+def forget(user_id):
+    get_cache().delete(_key(user_id))
+
+
+def get(user_id):
+    """
+    Пользователь из снимка или None.
+    Остальные поля отложены: обращение к ним дочитает строку из базы,
+    а save() без update_fields сохранит только поля снимка.
+    """
+    values = get_cache().get(_key(user_id))
+    if values is None:
+        return None
+    return User.from_db(router.db_for_read(User), FIELDS, values)
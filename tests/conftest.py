@@ -1,4 +1,7 @@
+import os
+import shutil
 import sys
+import tempfile
 from os.path import abspath, dirname, join
 
 root_dir = dirname(dirname(abspath(__file__)))
@@ -6,4 +9,53 @@ sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
+    'tests.fixtures.fixture_data',
 ]
+
+
+def pytest_configure(config):
+    """
+    Тесты с базой данных по умолчанию работают на sqlite в памяти,
+    чтобы не требовать запущенный PostgreSQL.
+    TEST_WITH_POSTGRES=1 оставляет базу из настроек проекта.
+    Кеш всегда свой на прогон: тесты очищают его перед каждым тестом
+    и не должны трогать кеш запущенного рядом сервера.
+    """
+    from threading import local
+
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.db import connections
+
+    config.cache_dir = tempfile.mkdtemp(prefix='yamdb_test_cache_')
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config.cache_dir,
+        },
+    }
+    caches._caches = local()
+    if os.getenv('TEST_WITH_POSTGRES'):
+        return
+    settings.DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        },
+        # Реплика для тестов маршрутизации чтения: второе соединение
+        # к той же базе, включается через settings.REPLICA_DATABASES.
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+            'TEST': {'MIRROR': 'default'},
+        },
+    }
+    # django.setup() уже открыл обработчик соединений с настройками
+    # PostgreSQL, поэтому сбрасываем его кеш под новые DATABASES.
+    connections.__dict__.pop('databases', None)
+    connections._databases = settings.DATABASES
+    connections._connections = local()
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(getattr(config, 'cache_dir', ''), ignore_errors=True)
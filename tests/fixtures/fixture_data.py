@@ -0,0 +1,117 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake', password='1234567'
+    )
+
+
+@pytest.fixture
+def another_user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUserAnother',
+        email='testuseranother@yamdb.fake',
+        password='1234567'
+    )
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin',
+        email='testadmin@yamdb.fake',
+        password='1234567',
+        role='admin'
+    )
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def admin_client(admin):
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+@pytest.fixture
+def title():
+    from reviews.models import Category, Genre, Title
+    category = Category.objects.create(name='Фильм', slug='film')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Чудо', year=1990, category=category)
+    title.genre.add(genre)
+    return title
+
+
+def seed_catalog(titles_count, reviews_per_title=3, comments_per_review=2,
+                 prefix=''):
+    """Наполняет базу произведениями с жанрами, отзывами и комментариями."""
+    from django.contrib.auth import get_user_model
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    User = get_user_model()
+    authors = [
+        User.objects.create(
+            username=f'{prefix}author{i}',
+            email=f'{prefix}author{i}@yamdb.fake'
+        )
+        for i in range(reviews_per_title)
+    ]
+    categories = [
+        Category.objects.create(
+            name=f'Категория {i}', slug=f'{prefix}category-{i}'
+        )
+        for i in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'{prefix}genre-{i}')
+        for i in range(3)
+    ]
+    titles = []
+    for i in range(titles_count):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i % 20,
+            category=categories[i % len(categories)]
+        )
+        title.genre.set(genres[:1 + i % len(genres)])
+        for author in authors:
+            review = Review.objects.create(
+                title=title, author=author, text=f'Отзыв {author}', score=5
+            )
+            for _ in range(comments_per_review):
+                Comment.objects.create(
+                    review=review, author=author, text='Комментарий'
+                )
+        titles.append(title)
+    return titles
+
+
+def warm_catalogs():
+    """Загружает справочники в память, как после первого запроса."""
+    from api.catalog import CATALOGS
+    for catalog in CATALOGS.values():
+        catalog.all()
+
+
+@pytest.fixture
+def catalog(db):
+    titles = seed_catalog(12)
+    warm_catalogs()
+    return titles
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
@@ -0,0 +1,8 @@
+from django.core.mail.backends.base import BaseEmailBackend
+
+
+class BrokenEmailBackend(BaseEmailBackend):
+    """Почтовый бэкенд, который не может отправить ни одного письма."""
+
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('SMTP недоступен')
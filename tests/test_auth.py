@@ -0,0 +1,93 @@
+import re
+
+import pytest
+from django.core.cache import cache
+from users.models import OutboxEmail, User
+
+
+@pytest.mark.django_db
+class TestAuth:
+
+    def post_signup(self, client, username='auth', email='auth@yamdb.fake'):
+        return client.post('/api/v1/auth/signup/', data={
+            'username': username, 'email': email
+        })
+
+    def signup(self, client, username='auth', email='auth@yamdb.fake'):
+        response = self.post_signup(client, username, email)
+        body = OutboxEmail.objects.order_by('id').last().body
+        return response, re.search(r'confirmation_code: (\w+)', body)[1]
+
+    def get_token(self, client, code, username='auth'):
+        return client.post('/api/v1/auth/token/', data={
+            'username': username, 'confirmation_code': code
+        })
+
+    def test_code_is_stored_hashed(self, client):
+        response, code = self.signup(client)
+        assert response.status_code == 200
+        user = User.objects.get(username='auth')
+        assert user.confirmation_code and code not in user.confirmation_code
+        assert user.confirmation_code_expires is not None
+
+    def test_signup_queries(self, client, django_assert_max_num_queries):
+        with django_assert_max_num_queries(3):
+            self.post_signup(client)
+        with django_assert_max_num_queries(3):
+            response = self.post_signup(client)
+        assert response.status_code == 200
+        assert User.objects.count() == 1
+
+    def test_signup_conflicts(self, client, user):
+        for data in (
+            {'username': 'other', 'email': user.email},
+            {'username': user.username, 'email': 'other@yamdb.fake'},
+        ):
+            response = client.post('/api/v1/auth/signup/', data=data)
+            assert response.status_code == 400, (
+                'Занятые username или email должны давать 400'
+            )
+
+    def test_token_from_cache(self, client, django_assert_num_queries):
+        _, code = self.signup(client)
+        # Проверка кода идет по кешу, запрос - только стирание кода.
+        with django_assert_num_queries(1):
+            response = self.get_token(client, code)
+        assert response.status_code == 201
+        assert 'access' in response.json()
+
+    def test_token_after_cache_miss(self, client, django_assert_num_queries):
+        _, code = self.signup(client)
+        cache.clear()
+        with django_assert_num_queries(2):
+            assert self.get_token(client, code).status_code == 201
+
+    def test_code_is_single_use(self, client):
+        _, code = self.signup(client)
+        assert self.get_token(client, code).status_code == 201
+        assert self.get_token(client, code).status_code == 400, (
+            'Код подтверждения после выдачи токена должен стать недействительным'
+        )
+        cache.clear()
+        assert self.get_token(client, code).status_code == 400
+        user = User.objects.get(username='auth')
+        assert user.confirmation_code == ''
+        assert user.confirmation_code_expires is None
+
+    def test_new_code_replaces_old(self, client):
+        _, first = self.signup(client)
+        _, second = self.signup(client)
+        assert self.get_token(client, first).status_code == 400
+        assert self.get_token(client, second).status_code == 201
+
+    def test_bad_requests(self, client, settings):
+        _, code = self.signup(client)
+        assert self.get_token(client, 'wrong').status_code == 400
+        assert self.get_token(client, code, 'nobody').status_code == 404
+
+        settings.CONFIRMATION_CODE_TTL = -1
+        cache.clear()
+        _, code = self.signup(client)
+        assert self.get_token(client, code).status_code == 400, (
+            'Проверьте, что просроченный код не принимается'
+        )
@@ -0,0 +1,98 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from api.benchmark import ROUTES, compare, percentile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from reviews.models import Review, Title
+from users.models import User
+
+BASELINE = Path(__file__).resolve().parent.parent / (
+    'api_yamdb/benchmarks/baseline.json'
+)
+
+DATASET = (
+    '--titles', '3', '--genres', '2', '--categories', '2', '--users', '4',
+    '--reviews-per-title', '2', '--comments-per-review', '1',
+    '--requests', '3', '--warmup', '1',
+)
+
+
+@pytest.mark.django_db
+class TestBenchmark:
+
+    def test_results_and_rollback(self, tmp_path):
+        output = tmp_path / 'results.json'
+        call_command(
+            'benchmark_api', *DATASET, '--output', str(output),
+            stdout=io.StringIO()
+        )
+        results = json.loads(output.read_text())
+        assert set(results) == {name for name, _ in ROUTES}
+        for name, metrics in results.items():
+            assert all(200 <= code < 300 for code in metrics['status']), (
+                f'{name} вернул ошибку'
+            )
+            assert metrics['p50_ms'] <= metrics['p99_ms']
+            assert metrics['queries'] >= 0 and metrics['rps'] > 0
+        assert not Title.objects.exists() and not User.objects.exists(), (
+            'Проверьте, что синтетические данные откатываются'
+        )
+        assert not Review.objects.exists()
+
+    def test_baseline_regressions(self, tmp_path):
+        baseline = tmp_path / 'baseline.json'
+        baseline.write_text(json.dumps({
+            'titles-list': {'p50_ms': 0.001, 'p90_ms': 0.001, 'queries': 0}
+        }))
+        with pytest.raises(CommandError):
+            call_command(
+                'benchmark_api', *DATASET, '--route', 'titles-list',
+                '--baseline', str(baseline), '--fail-on-regression',
+                stdout=io.StringIO()
+            )
+
+    def test_compare(self):
+        baseline = {'a': {'p50_ms': 10, 'p90_ms': 20, 'queries': 3}}
+        assert compare(
+            {'a': {'p50_ms': 11, 'p90_ms': 20, 'queries': 3}}, baseline, 0.2
+        ) == []
+        assert compare(
+            {'a': {'p50_ms': 13, 'p90_ms': 20, 'queries': 4}}, baseline, 0.2
+        ) == [('a', 'p50_ms', 10, 13), ('a', 'queries', 3, 4)]
+
+    def test_compare_skips_missing_metrics(self):
+        assert compare(
+            {'a': {'p50_ms': 50, 'p90_ms': 90, 'queries': 3}},
+            {'a': {'queries': 3}}, 0.2
+        ) == [], 'Время без базового значения не должно сравниваться'
+
+    def test_committed_baseline(self):
+        baseline = json.loads(BASELINE.read_text(encoding='utf-8'))
+        assert set(baseline) == {name for name, _ in ROUTES}, (
+            'В baseline.json должны быть все маршруты'
+        )
+        # Базовый прогон записан на PostgreSQL; без RETURNING пачка
+        # создает произведения по одному, и ее счет здесь другой.
+        routes = [
+            arg for name, _ in ROUTES
+            if connection.features.can_return_ids_from_bulk_insert
+            or name != 'titles-batch'
+            for arg in ('--route', name)
+        ]
+        call_command(
+            'benchmark_api', '--compare', str(BASELINE), *routes,
+            '--fail-on-regression', '--requests', '3', '--warmup', '1',
+            stdout=io.StringIO()
+        )
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 11))
+        assert percentile(values, 0.5) == 5
+        assert percentile(values, 0.9) == 9
+        assert percentile(values, 0.99) == 10
+        assert percentile([1, 2, 3, 4], 0.25) == 1, (
+            'Ранг должен округляться вверх, а не к четному'
+        )
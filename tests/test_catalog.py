@@ -0,0 +1,81 @@
+import pytest
+from api.catalog import CATALOGS, Catalog
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db
+class TestCatalog:
+
+    def test_lists_from_memory(
+        self, user_client, catalog, django_assert_num_queries
+    ):
+        for url in ('/api/v1/categories/', '/api/v1/genres/'):
+            with django_assert_num_queries(0):
+                response = user_client.get(f'{url}?search=1')
+            assert response.status_code == 200
+            assert [item['name'] for item in response.json()['results']] in (
+                ['Категория 1'], ['Жанр 1']
+            ), 'Проверьте поиск по названию в справочнике'
+
+    def test_other_workers_reconverge(self, db):
+        other = Catalog(Category)
+        assert other.all() == []
+        category = Category.objects.create(name='Кино', slug='movie')
+        assert other.by_slug('movie') == category, (
+            'Изменение справочника должно сдвигать поколение для всех'
+        )
+        category.delete()
+        assert other.all() == []
+        Category.objects.create(name='Музыка', slug='music')
+        other.all()
+        cache.clear()
+        Category.objects.filter(slug='music').update(name='Песни')
+        assert other.by_slug('music').name == 'Песни', (
+            'После очистки кеша справочник должен перечитываться'
+        )
+
+    def test_title_write_resolves_slugs_in_memory(
+        self, admin_client, catalog
+    ):
+        data = {
+            'name': 'Новое', 'year': 2000, 'category': 'category-1',
+            'genre': ['genre-2', 'genre-0'],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 201, response.content
+        assert not any(
+            '"slug" =' in query['sql'] or '"slug" IN' in query['sql']
+            for query in queries
+        ), 'Slug категории и жанра должны проверяться по справочнику'
+        title = Title.objects.get(pk=response.json()['id'])
+        assert title.category.slug == 'category-1'
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            'genre-0', 'genre-2'
+        }
+        data['genre'] = ['missing']
+        assert admin_client.post(
+            '/api/v1/titles/', data=data
+        ).status_code == 400
+
+    def test_filters_by_catalog_ids(self, client, catalog):
+        genre = Genre.objects.get(slug='genre-1')
+        response = client.get('/api/v1/titles/?genre=genre-1')
+        assert response.json()['count'] == genre.titles.count()
+        response = client.get('/api/v1/titles/?category=missing')
+        assert response.json()['count'] == 0
+        assert CATALOGS[Category].get(
+            Category.objects.get(slug='category-0').pk
+        ).name == 'Категория 0'
+
+    def test_reads_table_on_process_local_cache(self, catalog, settings):
+        settings.CACHES = {**settings.CACHES, 'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        Category.objects.filter(slug='category-0').update(name='Другая')
+        assert CATALOGS[Category].by_slug('category-0').name == 'Другая', (
+            'Без общего кеша справочник нельзя держать в памяти воркера'
+        )
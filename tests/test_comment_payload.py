@@ -0,0 +1,53 @@
+import pytest
+from reviews.models import Comment, Review
+
+from tests.fixtures.fixture_data import seed_catalog
+
+
+@pytest.mark.django_db
+class TestCommentPayload:
+
+    def urls(self, comments_per_review, prefix=''):
+        title = seed_catalog(
+            1, reviews_per_title=1, comments_per_review=comments_per_review,
+            prefix=prefix
+        )[0]
+        review = Review.objects.get(title=title)
+        Review.objects.filter(pk=review.pk).update(text='Отзыв ' * 200)
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        return review, url
+
+    def test_review_id_by_default(self, client):
+        review, url = self.urls(3)
+        comment = Comment.objects.filter(review=review).first()
+        results = client.get(url).json()['results']
+        assert {item['review'] for item in results} == {review.id}, (
+            'Проверьте, что в комментарии отзыв передается по id'
+        )
+        data = client.get(f'{url}{comment.id}/').json()
+        assert data['review'] == review.id
+
+    def test_expand_review(self, client):
+        review, url = self.urls(2)
+        comment = Comment.objects.filter(review=review).first()
+        compact = client.get(url)
+        expanded = client.get(f'{url}?expand=review')
+        assert expanded.json()['results'][0]['review'] == {
+            'id': review.id, 'text': 'Отзыв ' * 200
+        }
+        assert len(compact.content) * 5 < len(expanded.content), (
+            'Компактный ответ не должен повторять текст отзыва'
+        )
+        data = client.get(f'{url}{comment.id}/?expand=review').json()
+        assert data['review']['id'] == review.id
+        assert client.get(f'{url}?expand=author').status_code == 400
+
+    @pytest.mark.parametrize('expand', ['', '?expand=review'])
+    def test_page_costs_fixed_queries(
+        self, client, expand, django_assert_num_queries
+    ):
+        _, small = self.urls(1)
+        _, big = self.urls(8, prefix='big')
+        for url in (small, big):
+            with django_assert_num_queries(2):
+                assert client.get(f'{url}{expand}').status_code == 200
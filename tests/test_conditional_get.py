@@ -0,0 +1,69 @@
+import pytest
+from reviews.models import Comment, Review
+from users.models import User
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('template', (
+        '/api/v1/titles/{id}/', '/api/v1/titles/{id}/reviews/'
+    ))
+    def test_not_modified(
+        self, client, title, template, django_assert_num_queries
+    ):
+        url = template.format(id=title.id)
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response['ETag']
+        assert response['Last-Modified']
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что неизмененный ресурс отдается с кодом 304'
+        )
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == 304
+
+    def test_reviews_and_comments_change_etag(self, client, title, user):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = client.get(url)['ETag']
+        review = Review.objects.create(
+            title=title, author=user, text='!', score=4
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый отзыв меняет ETag'
+        )
+        etag = response['ETag']
+        Comment.objects.create(review=review, author=user, text='?')
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что новый комментарий меняет ETag'
+        )
+
+    def test_missing_title(self, client, db):
+        assert client.get('/api/v1/titles/404/').status_code == 404
+        assert client.get('/api/v1/titles/404/reviews/').status_code == 404
+
+    def test_author_rename_changes_etag(self, client, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='!', score=4
+        )
+        Comment.objects.create(review=review, author=user, text='?')
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = client.get(url)['ETag']
+        user = User.objects.get(pk=user.pk)
+        user.bio = 'Новое о себе'
+        user.save()
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 304, 'Без смены имени ETag меняться не должен'
+        user.username = 'renamed'
+        user.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что смена имени автора меняет ETag ленты отзывов'
+        )
+        assert response.json()['results'][0]['author'] == 'renamed'
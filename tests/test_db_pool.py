@@ -0,0 +1,90 @@
+import pytest
+from django.db import OperationalError
+
+from api_yamdb.db.pool import get_stats
+from api_yamdb.db.sqlite3.base import DatabaseWrapper
+
+
+@pytest.fixture
+def make_wrapper(tmp_path, request):
+    alias = f'pool-{request.node.name}'
+    wrappers = []
+
+    def make(**pool):
+        wrapper = DatabaseWrapper({
+            'ENGINE': 'api_yamdb.db.sqlite3',
+            'NAME': str(tmp_path / 'pool.sqlite3'),
+            'POOL': dict({'MAX_SIZE': 2, 'TIMEOUT': 0.05}, **pool),
+            'ATOMIC_REQUESTS': False, 'AUTOCOMMIT': True,
+            'CONN_MAX_AGE': 0, 'OPTIONS': {}, 'TIME_ZONE': None,
+            'USER': '', 'PASSWORD': '', 'HOST': '', 'PORT': '',
+            'TEST': {},
+        }, alias)
+        wrappers.append(wrapper)
+        return wrapper
+
+    yield make
+    for wrapper in wrappers:
+        pool = wrapper.get_pool()
+        wrapper.close()
+        if pool is not None:
+            pool.clear()
+
+
+@pytest.mark.django_db
+class TestConnectionPool:
+
+    def test_connection_is_reused(self, make_wrapper):
+        wrapper = make_wrapper()
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.close()
+        wrapper.ensure_connection()
+        assert wrapper.connection is raw, (
+            'Проверьте, что закрытое соединение возвращается в пул'
+        )
+        stats = get_stats()[wrapper.alias]
+        assert stats['created'] == 1 and stats['reused'] == 1
+        assert stats['health_checks'] == 1 and stats['in_use'] == 1
+
+    def test_pool_is_capped(self, make_wrapper):
+        first, second, third = make_wrapper(), make_wrapper(), make_wrapper()
+        first.ensure_connection()
+        second.ensure_connection()
+        with pytest.raises(OperationalError):
+            third.ensure_connection()
+        first.close()
+        third.ensure_connection()
+        assert get_stats()[third.alias]['timeouts'] == 1
+
+    def test_broken_connections_are_replaced(self, make_wrapper):
+        wrapper = make_wrapper()
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.close()
+        raw.close()
+        wrapper.ensure_connection()
+        assert wrapper.connection is not raw
+        stats = get_stats()[wrapper.alias]
+        assert stats['health_check_failures'] == 1
+
+        wrapper.errors_occurred = True
+        wrapper.close()
+        assert get_stats()[wrapper.alias]['idle'] == 0, (
+            'Соединение после ошибки не должно возвращаться в пул'
+        )
+
+    def test_without_pool_option(self, make_wrapper):
+        wrapper = make_wrapper()
+        wrapper.settings_dict['POOL'] = None
+        wrapper.ensure_connection()
+        wrapper.close()
+        assert wrapper.alias not in get_stats()
+
+
+@pytest.mark.django_db
+def test_pool_stats_view(admin_client, user_client):
+    assert user_client.get('/api/v1/db-pool-stats/').status_code == 403
+    response = admin_client.get('/api/v1/db-pool-stats/')
+    assert response.status_code == 200
+    assert isinstance(response.json(), dict)
@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from reviews.models import Review
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_export_requires_admin(self, client, user_client):
+        assert client.get('/api/v1/titles/export/').status_code == 401
+        assert user_client.get('/api/v1/titles/export/').status_code == 403
+
+    def test_export_ndjson(self, admin_client, title, user):
+        Review.objects.create(title=title, author=user, text='!', score=7)
+        response = admin_client.get('/api/v1/titles/export/')
+        assert response.status_code == 200
+        assert response.streaming, 'Проверьте, что выгрузка отдается потоком'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line) for line in lines] == [{
+            'id': title.id, 'name': 'Чудо', 'year': 1990,
+            'category': 'film', 'genre': ['drama'], 'rating': 7,
+            'description': '',
+        }]
+
+    def test_export_csv(self, admin_client, title):
+        response = admin_client.get('/api/v1/titles/export/?file_format=csv')
+        assert response['Content-Type'] == 'text/csv'
+        rows = list(csv.DictReader(io.StringIO(
+            b''.join(response.streaming_content).decode()
+        )))
+        assert rows[0]['genre'] == 'drama' and rows[0]['rating'] == ''
+        response = admin_client.get('/api/v1/titles/export/?file_format=xml')
+        assert response.status_code == 400
+
+    def test_export_command(self, title):
+        out = io.StringIO()
+        call_command('export_titles', stdout=out)
+        assert json.loads(out.getvalue())['name'] == 'Чудо'
@@ -0,0 +1,101 @@
+import io
+import random
+from types import SimpleNamespace
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Avg, Count
+from reviews.generate import review_counts
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+
+def snapshot():
+    first = {
+        model: model.objects.order_by('pk').first().pk
+        for model in (Title, User, Review, Comment)
+    }
+    reviews = sorted(
+        (pk - first[Review], title_id - first[Title],
+         author_id - first[User], score, pub_date)
+        for pk, title_id, author_id, score, pub_date
+        in Review.objects.values_list(
+            'pk', 'title_id', 'author_id', 'score', 'pub_date'
+        )
+    )
+    comments = sorted(
+        (pk - first[Comment], review_id - first[Review],
+         author_id - first[User], pub_date)
+        for pk, review_id, author_id, pub_date
+        in Comment.objects.values_list(
+            'pk', 'review_id', 'author_id', 'pub_date'
+        )
+    )
+    return reviews, comments
+
+
+class ReversedPool:
+    """Пул, который завершает задачи в обратном порядке в этом процессе."""
+
+    def __init__(self, workers):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def imap_unordered(self, func, items):
+        return map(func, reversed(list(items)))
+
+
+@pytest.mark.django_db
+class TestGenerateData:
+
+    def generate(self, *args):
+        call_command(
+            'generate_yamdb_data', '--titles', '40', '--users', '15',
+            '--reviews', '300', '--chunk-titles', '7', '--batch-size', '50',
+            *args, stdout=io.StringIO()
+        )
+
+    def test_volumes_and_constraints(self):
+        self.generate()
+        assert Title.objects.count() == 40 and User.objects.count() == 15
+        assert Review.objects.count() == 300
+        assert not Review.objects.values('title', 'author').annotate(
+            n=Count('id')
+        ).filter(n__gt=1).exists(), 'Пара произведение-автор повторяется'
+        assert Comment.objects.exists()
+        title = Title.objects.order_by('-review_count').first()
+        assert title.review_count == title.title_reviews.count()
+        assert title.rating == int(
+            title.title_reviews.aggregate(Avg('score'))['score__avg']
+        ), 'Проверьте, что рейтинги пересчитаны после генерации'
+
+    def test_deterministic(self, monkeypatch):
+        self.generate('--seed', '7')
+        first = snapshot()
+        Title.objects.all().delete()
+        User.objects.all().delete()
+        pool = SimpleNamespace(Pool=ReversedPool)
+        monkeypatch.setattr(
+            'reviews.generate.multiprocessing',
+            SimpleNamespace(get_context=lambda method: pool)
+        )
+        self.generate('--seed', '7', '--workers', '3')
+        assert snapshot() == first, (
+            'Одинаковый seed должен давать те же отзывы и комментарии '
+            'с теми же id и датами при любом числе процессов'
+        )
+
+    def test_review_counts_are_skewed(self):
+        counts = review_counts(1000, 10 ** 6, 50000, 1.0, random.Random(1))
+        ordered = sorted(counts, reverse=True)
+        assert sum(counts) == 50000
+        assert sum(ordered[:100]) > sum(ordered[100:]), (
+            '10% произведений должны собирать большую часть отзывов'
+        )
+        capped = review_counts(10, 5, 1000, 1.0, random.Random(1))
+        assert capped == [5] * 10
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+from reviews.models import Comment, Genre, Review, Title
+
+
+def _write(path, lines):
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.django_db
+class TestImportCommand:
+
+    def test_import_csv_and_ndjson(self, tmp_path):
+        paths = [
+            _write(tmp_path / 'users.csv', [
+                'id,username,email,role',
+                '100,reader,reader@yamdb.fake,user',
+                '101,critic,critic@yamdb.fake,moderator',
+            ]),
+            _write(tmp_path / 'category.csv', [
+                'id,name,slug', '1,Фильм,movie', '2,Книга,book',
+            ]),
+            _write(tmp_path / 'genre.csv', [
+                'id,name,slug', '1,Драма,drama', '2,Комедия,comedy',
+            ]),
+            _write(tmp_path / 'titles.ndjson', [
+                json.dumps({
+                    'id': 1, 'name': 'Чудо', 'year': 1990,
+                    'category': 'movie', 'genre': ['drama', 'comedy'],
+                }),
+                json.dumps({
+                    'id': 2, 'name': 'Роман', 'year': 1869, 'category': 2,
+                }),
+            ]),
+            _write(tmp_path / 'review.csv', [
+                'id,title_id,text,author,score,pub_date',
+                '1,1,Отлично,100,9,2019-09-24T21:08:21.567Z',
+                '2,1,Неплохо,101,4,2019-09-25T21:08:21.567Z',
+            ]),
+            _write(tmp_path / 'comments.csv', [
+                'id,review_id,text,author,pub_date',
+                '1,1,Согласен,101,2019-09-26T21:08:21.567Z',
+            ]),
+        ]
+        call_command('import_yamdb', *paths, batch_size=1)
+
+        title = Title.objects.get(pk=1)
+        assert title.category.slug == 'movie'
+        assert sorted(title.genre.values_list('slug', flat=True)) == [
+            'comedy', 'drama'
+        ]
+        assert (title.review_count, title.rating) == (2, 6), (
+            'Проверьте, что рейтинг пересчитывается после загрузки'
+        )
+        assert Review.objects.get(pk=1).pub_date.year == 2019, (
+            'Проверьте, что дата публикации берется из выгрузки'
+        )
+        assert Comment.objects.get(pk=1).review_id == 1
+
+    def test_resume(self, tmp_path):
+        path = _write(tmp_path / 'genre.csv', [
+            'id,name,slug', '1,Драма,drama', '2,Комедия,comedy',
+        ])
+        (tmp_path / 'genre.csv.progress').write_text(
+            json.dumps({'rows': 1, 'finished': False})
+        )
+        call_command('import_yamdb', path, resume=True)
+        assert list(Genre.objects.values_list('slug', flat=True)) == [
+            'comedy'
+        ], 'Проверьте, что загрузка продолжается с сохраненной позиции'
+        call_command('import_yamdb', path, resume=True)
+        assert Genre.objects.count() == 1, (
+            'Проверьте, что загруженный файл при продолжении пропускается'
+        )
+
+    def test_titles_without_ids(self, tmp_path):
+        category = _write(tmp_path / 'category.csv', [
+            'id,name,slug', '1,Фильм,movie',
+        ])
+        genre = _write(tmp_path / 'genre.csv', [
+            'id,name,slug', '1,Драма,drama',
+        ])
+        plain = _write(tmp_path / 'titles.ndjson', [
+            json.dumps({'name': 'Чудо', 'year': 1990, 'category': 'movie'}),
+            json.dumps({'name': 'Роман', 'year': 1869}),
+        ])
+        call_command('import_yamdb', category, genre, plain)
+        assert sorted(Title.objects.values_list('name', flat=True)) == [
+            'Роман', 'Чудо'
+        ], 'Произведения без id и жанров должны загружаться'
+
+        tagged = _write(tmp_path / 'titles.ndjson', [
+            json.dumps({'name': 'Новое', 'year': 2000, 'genre': ['drama']}),
+        ])
+        with pytest.raises(CommandError, match='колонка id'):
+            call_command('import_yamdb', tagged)
+        mixed = _write(tmp_path / 'titles.ndjson', [
+            json.dumps({'id': 50, 'name': 'С id', 'year': 2000}),
+            json.dumps({'name': 'Без id', 'year': 2000}),
+        ])
+        with pytest.raises(CommandError, match='части'):
+            call_command('import_yamdb', mixed)
+        assert Title.objects.count() == 2, (
+            'Пачка с ошибкой не должна записываться'
+        )
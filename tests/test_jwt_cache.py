@@ -0,0 +1,72 @@
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+def jwt_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db
+class TestJWTUserCache:
+
+    def test_get_skips_users_table(self, user, django_assert_num_queries):
+        client = jwt_client(user)
+        with django_assert_num_queries(1):
+            assert client.get('/api/v1/users/me/').status_code == 200
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/users/me/')
+        assert response.json()['username'] == user.username
+
+    def test_role_change_via_viewset(self, user, admin_client):
+        client = jwt_client(user)
+        assert client.get('/api/v1/users/').status_code == 403
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли сбрасывает снимок пользователя'
+        )
+
+    def test_delete_and_deactivate(self, user, another_user):
+        client = jwt_client(user)
+        client.get('/api/v1/users/me/')
+        user.delete()
+        assert client.get('/api/v1/users/me/').status_code == 401
+
+        client = jwt_client(another_user)
+        client.get('/api/v1/users/me/')
+        another_user.is_active = False
+        another_user.save()
+        assert client.get('/api/v1/users/me/').status_code == 401
+
+    def test_writes_use_full_user(self, user):
+        user.set_password('secret-password')
+        user.save()
+        client = jwt_client(user)
+        client.get('/api/v1/users/me/')
+        response = client.patch('/api/v1/users/me/', data={'bio': 'Кино'})
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.bio == 'Кино'
+        assert user.check_password('secret-password'), (
+            'Запись через снимок не должна затирать остальные поля'
+        )
+
+    def test_disabled_on_process_local_cache(
+        self, user, settings, django_assert_num_queries
+    ):
+        settings.CACHES = {**settings.CACHES, 'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        client = jwt_client(user)
+        client.get('/api/v1/users/me/')
+        with django_assert_num_queries(1):
+            assert client.get('/api/v1/users/me/').status_code == 200, (
+                'Без общего кеша пользователь читается из базы'
+            )
@@ -0,0 +1,63 @@
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from users.models import OutboxEmail
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def signup(self, client, username='outbox'):
+        return client.post('/api/v1/auth/signup/', data={
+            'username': username, 'email': f'{username}@yamdb.fake'
+        })
+
+    def test_signup_only_enqueues(self, client, mailoutbox):
+        assert self.signup(client).status_code == 200
+        assert mailoutbox == [], (
+            'Проверьте, что регистрация не отправляет письмо сама'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.recipient == 'outbox@yamdb.fake'
+        assert email.status == OutboxEmail.PENDING
+
+    def test_run_outbox_sends_batch(self, client, mailoutbox):
+        self.signup(client, 'first')
+        self.signup(client, 'second')
+        call_command('run_outbox', '--once', stdout=None)
+        assert sorted(m.to[0] for m in mailoutbox) == [
+            'first@yamdb.fake', 'second@yamdb.fake'
+        ]
+        assert not OutboxEmail.objects.exclude(status=OutboxEmail.SENT)
+        assert not OutboxEmail.objects.exclude(body=''), (
+            'Код подтверждения не должен храниться после отправки'
+        )
+        call_command('run_outbox', '--once', stdout=None)
+        assert len(mailoutbox) == 2, 'Отправленное письмо ушло повторно'
+
+    def test_failed_delivery_is_retried(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.fixtures.mail.BrokenEmailBackend'
+        self.signup(client)
+        call_command(
+            'run_outbox', '--once', '--max-attempts', '2',
+            '--retry-delay', '60', stdout=None
+        )
+        email = OutboxEmail.objects.get()
+        assert email.status == OutboxEmail.PENDING
+        assert email.attempts == 1 and 'SMTP' in email.last_error
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что повтор откладывается'
+        )
+
+        call_command('run_outbox', '--once', stdout=None)
+        assert OutboxEmail.objects.get().attempts == 1, (
+            'Письмо не должно повторяться до окончания паузы'
+        )
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        call_command(
+            'run_outbox', '--once', '--max-attempts', '2', stdout=None
+        )
+        email = OutboxEmail.objects.get()
+        assert email.attempts == 2 and email.status == OutboxEmail.FAILED
+        assert email.body == ''
@@ -0,0 +1,49 @@
+import logging
+import re
+
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def profiling(settings):
+    settings.REQUEST_PROFILING = True
+    settings.REQUEST_PROFILING_MAX_QUERIES = 100
+    settings.REQUEST_PROFILING_MAX_MS = 60000
+    return settings
+
+
+def timings(response):
+    return dict(
+        re.findall(r'(\w+);dur=([\d.]+)', response['Server-Timing'])
+    )
+
+
+@pytest.mark.django_db
+class TestRequestProfiling:
+
+    def test_disabled_by_default(self, client, title):
+        response = client.get('/api/v1/titles/')
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что без REQUEST_PROFILING middleware отключен'
+        )
+
+    def test_server_timing(self, profiling, title):
+        response = APIClient().get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        assert set(timings(response)) == {'db', 'serializer', 'view', 'total'}
+        assert '3 queries' in response['Server-Timing']
+        assert float(timings(response)['serializer']) > 0
+
+    def test_slow_request_is_logged(self, profiling, title, caplog):
+        profiling.REQUEST_PROFILING_MAX_QUERIES = 1
+        with caplog.at_level(logging.WARNING, logger='api.slow_requests'):
+            APIClient().get('/api/v1/titles/')
+        assert len(caplog.records) == 1, 'Проверьте журнал медленных запросов'
+        assert 'FROM "reviews_title"' in caplog.records[0].getMessage()
+
+        caplog.clear()
+        profiling.REQUEST_PROFILING_MAX_QUERIES = 100
+        with caplog.at_level(logging.WARNING, logger='api.slow_requests'):
+            APIClient().get('/api/v1/titles/')
+        assert not caplog.records
@@ -0,0 +1,280 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+from tests.fixtures.fixture_data import seed_catalog, warm_catalogs
+
+PUBLIC_BUDGETS = (
+    ('/api/v1/titles/', 3),
+    ('/api/v1/titles/{title_id}/', 3),
+    ('/api/v1/categories/', 0),
+    ('/api/v1/genres/', 0),
+    ('/api/v1/titles/{title_id}/reviews/', 3),
+    ('/api/v1/titles/{title_id}/reviews/{review_id}/', 3),
+    ('/api/v1/titles/{title_id}/reviews/{review_id}/comments/', 2),
+)
+
+# PATCH и DELETE комментария, затем PATCH и DELETE отзыва.
+WRITE_BUDGETS = (3, 3, 5, 4)
+
+# POST отзыва, затем POST комментария к нему.
+CREATE_BUDGETS = (5, 3)
+
+# Запись справочников и произведений администратором: POST категории
+# и жанра, POST, PATCH полей, PATCH жанров и DELETE произведения,
+# затем DELETE жанра и категории. Запись произведения идет в transaction.atomic:
+# внутри тестовой транзакции это SAVEPOINT и RELEASE.
+CATALOG_WRITE_BUDGETS = (3, 3, 7, 5, 8, 5, 4, 4)
+
+ADMIN_BUDGETS = (
+    ('/api/v1/users/', 2),
+    ('/api/v1/users/TestUser/', 1),
+    ('/api/v1/users/me/', 0),
+)
+
+
+def _url(template, title):
+    review = Review.objects.filter(title=title).first()
+    return template.format(title_id=title.id, review_id=review.id)
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    @pytest.mark.parametrize('template,budget', PUBLIC_BUDGETS)
+    def test_public_endpoints(
+        self, client, catalog, template, budget,
+        django_assert_max_num_queries
+    ):
+        url = _url(template, catalog[0])
+        with django_assert_max_num_queries(budget):
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что {url} доступен без токена'
+        )
+
+    @pytest.mark.parametrize('template,budget', ADMIN_BUDGETS)
+    def test_admin_endpoints(
+        self, admin_client, user, template, budget,
+        django_assert_max_num_queries
+    ):
+        with django_assert_max_num_queries(budget):
+            response = admin_client.get(template)
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize('template', [t for t, _ in PUBLIC_BUDGETS])
+    def test_query_count_does_not_grow_with_data(self, db, template):
+        client = APIClient()
+        title = seed_catalog(1, reviews_per_title=1, comments_per_review=1)[0]
+        url = _url(template, title)
+        with CaptureQueriesContext(connection) as small:
+            client.get(url)
+
+        seed_catalog(12, prefix='more-')
+        for author in User.objects.filter(username__startswith='more-'):
+            review = Review.objects.create(
+                title=title, author=author, text='Еще отзыв', score=7
+            )
+            Comment.objects.create(
+                review=Review.objects.filter(title=title).first(),
+                author=author, text='Еще комментарий'
+            )
+            Comment.objects.create(review=review, author=author, text='!')
+        with CaptureQueriesContext(connection) as large:
+            client.get(url)
+        assert len(large) == len(small), (
+            f'Число запросов к {template} растет вместе с объемом данных'
+        )
+
+    def test_feed_pages_cost_the_same(self, db):
+        client = APIClient()
+        title = seed_catalog(1, reviews_per_title=25)[0]
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        costs = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            assert not any(
+                'COUNT(' in query['sql'] for query in queries
+            ), 'Проверьте, что лента отзывов не считает COUNT(*)'
+            costs.append(len(queries))
+            url = response.json()['next']
+        assert len(costs) == 3 and len(set(costs)) == 1, (
+            'Проверьте, что все страницы ленты стоят одинаково'
+        )
+
+
+@pytest.mark.django_db
+class TestWriteQueryBudget:
+
+    def measure(self, client, title):
+        user = User.objects.get(username='TestUser')
+        review = Review.objects.create(
+            title=title, author=user, text='!', score=5
+        )
+        comment = Comment.objects.create(review=review, author=user, text='!')
+        review_url = f'/api/v1/titles/{title.id}/reviews/{review.id}/'
+        comment_url = f'{review_url}comments/{comment.id}/'
+        costs = []
+        for method, url, data in (
+            ('patch', comment_url, {'text': '?'}),
+            ('delete', comment_url, None),
+            ('patch', review_url, {'score': 9}),
+            ('delete', review_url, None),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(client, method)(url, data=data)
+            assert response.status_code in (200, 204), (
+                f'Проверьте, что автор может выполнить {method} {url}'
+            )
+            costs.append(len(queries))
+        return tuple(costs)
+
+    def test_writes_cost_fixed_queries(self, user_client):
+        small = seed_catalog(1, reviews_per_title=1, comments_per_review=1)
+        big = seed_catalog(
+            3, reviews_per_title=6, comments_per_review=4, prefix='big'
+        )
+        assert self.measure(user_client, small[0]) == WRITE_BUDGETS
+        assert self.measure(user_client, big[0]) == WRITE_BUDGETS, (
+            'Число запросов на запись не должно зависеть от объема данных'
+        )
+
+    def measure_catalog(self, client, prefix):
+        category_slug, genre_slug = f'{prefix}-category', f'{prefix}-genre'
+        title_url = None
+        steps = (
+            ('post', '/api/v1/categories/',
+             {'name': 'Категория', 'slug': category_slug}),
+            ('post', '/api/v1/genres/',
+             {'name': 'Жанр', 'slug': genre_slug}),
+            ('post', '/api/v1/titles/', {
+                'name': 'Новое', 'year': 2000, 'category': category_slug,
+                'genre': [genre_slug],
+            }),
+            ('patch', None, {'name': 'Другое', 'year': 2001}),
+            ('patch', None, {'genre': [genre_slug, f'{prefix}genre-0']}),
+            ('delete', None, None),
+            ('delete', f'/api/v1/genres/{genre_slug}/', None),
+            ('delete', f'/api/v1/categories/{category_slug}/', None),
+        )
+        costs = []
+        for method, url, data in steps:
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(client, method)(url or title_url, data=data)
+            assert response.status_code in (200, 201, 204), (
+                f'{method} {url or title_url}: {response.content}'
+            )
+            if title_url is None and 'titles' in (url or ''):
+                title_url = f'/api/v1/titles/{response.json()["id"]}/'
+            costs.append(len(queries))
+        return tuple(costs)
+
+    def test_catalog_writes_cost_fixed_queries(self, admin_client):
+        seed_catalog(1, reviews_per_title=1, prefix='small')
+        warm_catalogs()
+        small = self.measure_catalog(admin_client, 'small')
+        seed_catalog(
+            6, reviews_per_title=6, comments_per_review=2, prefix='big'
+        )
+        warm_catalogs()
+        big = self.measure_catalog(admin_client, 'big')
+        assert small == big == CATALOG_WRITE_BUDGETS, (
+            'Число запросов на запись произведений и справочников '
+            'не должно зависеть от объема данных'
+        )
+
+    @pytest.mark.parametrize('model', (Review, Title))
+    def test_cascade_cost_does_not_grow_with_comments(self, model):
+        costs = []
+        for prefix, comments in (('few', 1), ('many', 8)):
+            title = seed_catalog(
+                1, reviews_per_title=4, comments_per_review=comments,
+                prefix=prefix
+            )[0]
+            review = Review.objects.filter(title=title).first()
+            obj = review if model is Review else title
+            with CaptureQueriesContext(connection) as queries:
+                obj.delete()
+            costs.append(len(queries))
+        assert costs[0] == costs[1], (
+            'Удаление не должно трогать произведение за каждый комментарий'
+        )
+
+    def test_creates_load_parents_once(self, user_client):
+        title = seed_catalog(1, reviews_per_title=0)[0]
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        costs = []
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.post(
+                reviews_url, data={'text': '!', 'score': 7}
+            )
+        assert response.status_code == 201, response.content
+        costs.append(len(queries))
+        comments_url = f'{reviews_url}{response.json()["id"]}/comments/'
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.post(comments_url, data={'text': '!'})
+        assert response.status_code == 201, response.content
+        costs.append(len(queries))
+        assert tuple(costs) == CREATE_BUDGETS, (
+            'Проверьте, что родитель загружается один раз за запрос'
+        )
+
+    def test_duplicate_review_rejected_by_constraint(self, user_client):
+        title = seed_catalog(1, reviews_per_title=0)[0]
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert user_client.post(
+            url, data={'text': '!', 'score': 7}
+        ).status_code == 201
+        response = user_client.post(url, data={'text': '?', 'score': 1})
+        assert response.status_code == 400, (
+            'Повторный отзыв автора должен возвращать 400'
+        )
+        assert 'non_field_errors' in response.json()
+        title.refresh_from_db()
+        assert (title.rating, title.review_count) == (7, 1), (
+            'Отклоненный отзыв не должен менять рейтинг'
+        )
+
+    def test_missing_parents(self, user_client):
+        title = seed_catalog(1, reviews_per_title=1)[0]
+        review = Review.objects.get(title=title)
+        other = seed_catalog(1, reviews_per_title=1, prefix='other')[0]
+        for url in (
+            '/api/v1/titles/0/reviews/',
+            f'/api/v1/titles/{other.id}/reviews/{review.id}/',
+            f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/',
+        ):
+            assert user_client.get(url).status_code == 404, url
+        comment = Comment.objects.filter(review=review).first()
+        url = (
+            f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/'
+            f'{comment.id}/'
+        )
+        assert user_client.get(url).status_code == 404
+        assert user_client.post(
+            f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/',
+            data={'text': '!'}
+        ).status_code == 404
+
+    def test_moderator_writes_without_author_lookup(
+        self, user, another_user, django_assert_num_queries
+    ):
+        title = seed_catalog(1, reviews_per_title=0)[0]
+        review = Review.objects.create(
+            title=title, author=user, text='!', score=5
+        )
+        client = APIClient()
+        client.force_authenticate(another_user)
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/'
+        assert client.delete(url).status_code == 403, (
+            'Чужой отзыв может удалить только модератор или админ'
+        )
+        another_user.role = 'moderator'
+        another_user.save()
+        with django_assert_num_queries(WRITE_BUDGETS[3]):
+            response = client.delete(url)
+        assert response.status_code == 204
@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Review, Title
+
+from tests.fixtures.fixture_data import seed_catalog
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_reviews(self, title, user, another_user):
+        review = Review.objects.create(
+            title=title, author=user, text='Хорошо', score=10
+        )
+        Review.objects.create(
+            title=title, author=another_user, text='Плохо', score=3
+        )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.review_count, title.rating) == (
+            13, 2, 6
+        ), 'Проверьте, что рейтинг пересчитывается при создании отзыва'
+
+        review = Review.objects.get(pk=review.pk)
+        review.score = 5
+        review.save()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.review_count, title.rating) == (
+            8, 2, 4
+        ), 'Проверьте, что рейтинг пересчитывается при смене оценки'
+
+        review.delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.review_count, title.rating) == (
+            3, 1, 3
+        ), 'Проверьте, что рейтинг пересчитывается при удалении отзыва'
+
+        Review.objects.all().delete()
+        title.refresh_from_db()
+        assert title.rating is None, (
+            'Проверьте, что у произведения без отзывов нет рейтинга'
+        )
+
+    def test_recalculate_rating(self, title, user, another_user):
+        Review.objects.bulk_create([
+            Review(title=title, author=user, text='1', score=7),
+            Review(title=title, author=another_user, text='2', score=8),
+        ])
+        Title.objects.recalculate_rating()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.review_count, title.rating) == (
+            15, 2, 7
+        ), 'Проверьте пересчет рейтинга по таблице отзывов'
+
+    def test_titles_ordered_and_filtered_by_rating(
+        self, client, title, user
+    ):
+        other = Title.objects.create(name='Другое', year=2000)
+        Review.objects.create(title=title, author=user, text='1', score=2)
+        Review.objects.create(title=other, author=user, text='2', score=9)
+        response = client.get('/api/v1/titles/?ordering=-rating')
+        assert response.status_code == 200
+        ratings = [item['rating'] for item in response.json()['results']]
+        assert ratings == [9, 2], (
+            'Проверьте, что список произведений сортируется по рейтингу'
+        )
+        response = client.get('/api/v1/titles/?rating__gte=5')
+        assert [item['id'] for item in response.json()['results']] == [
+            other.id
+        ], 'Проверьте фильтрацию произведений по рейтингу'
+
+    def test_title_delete_skips_rating_updates(self, db):
+        costs = []
+        for prefix, reviews in (('few', 1), ('many', 8)):
+            title = seed_catalog(
+                1, reviews_per_title=reviews, comments_per_review=1,
+                prefix=prefix
+            )[0]
+            with CaptureQueriesContext(connection) as queries:
+                title.delete()
+            costs.append(len(queries))
+            assert not Review.objects.filter(title_id=title.pk).exists()
+        assert costs[0] == costs[1], (
+            'Удаление произведения не должно пересчитывать его рейтинг '
+            'за каждый отзыв'
+        )
+        title = seed_catalog(1, reviews_per_title=2, prefix='left')[0]
+        Review.objects.filter(title=title).first().delete()
+        title.refresh_from_db()
+        assert title.review_count == 1, (
+            'Удаление отдельного отзыва по-прежнему меняет рейтинг'
+        )
@@ -0,0 +1,99 @@
+import pytest
+from api.cache import KEY_PREFIX, get_cache
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+pytestmark = pytest.mark.django_db(
+    transaction=True, databases=['default', 'replica']
+)
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.REPLICA_DATABASES = ['replica']
+    settings.REPLICA_PIN_SECONDS = 60
+    return settings
+
+
+def queries_by_alias(client, url):
+    with CaptureQueriesContext(connections['default']) as primary:
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = client.get(url)
+    assert response.status_code == 200
+    return len(primary), len(replica)
+
+
+def jwt_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    return client
+
+
+class TestReplicaRouting:
+
+    def test_reads_go_to_replica(self, replicas, title):
+        primary, replica = queries_by_alias(
+            APIClient(), f'/api/v1/titles/{title.id}/reviews/'
+        )
+        assert primary == 0 and replica > 0, (
+            'Проверьте, что GET-запросы читают с реплики'
+        )
+
+    def test_without_replicas_everything_uses_primary(self, title):
+        primary, replica = queries_by_alias(
+            APIClient(), f'/api/v1/titles/{title.id}/reviews/'
+        )
+        assert primary > 0 and replica == 0
+
+    def test_writer_is_pinned_by_cookie(self, replicas, admin):
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.post(
+            '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'}
+        )
+        assert response.status_code == 201
+        primary, replica = queries_by_alias(client, '/api/v1/genres/')
+        assert replica == 0 and primary > 0, (
+            'После записи чтение должно идти в основную базу'
+        )
+
+    def test_writer_is_pinned_by_jwt(self, replicas, user, title):
+        response = jwt_client(user).post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отлично', 'score': 9}
+        )
+        assert response.status_code == 201
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        primary, replica = queries_by_alias(jwt_client(user), url)
+        assert replica == 0, (
+            'Автор записи закрепляется за основной базой по JWT'
+        )
+        primary, replica = queries_by_alias(APIClient(), url)
+        assert primary == 0 and replica > 0
+
+    @pytest.mark.parametrize('with_replicas,timeout', ((False, 300), (True, 5)))
+    def test_replica_responses_cached_briefly(
+        self, settings, monkeypatch, title, with_replicas, timeout
+    ):
+        settings.RESPONSE_CACHE_TIMEOUT = 300
+        settings.REPLICA_PIN_SECONDS = 5
+        if with_replicas:
+            settings.REPLICA_DATABASES = ['replica']
+        cache = get_cache()
+        timeouts = []
+        original = cache.set
+
+        def record(key, value, timeout=None, *args, **kwargs):
+            if key.startswith(f'{KEY_PREFIX}:titles:') and ':list:' in key:
+                timeouts.append(timeout)
+            return original(key, value, timeout, *args, **kwargs)
+
+        monkeypatch.setattr(cache, 'set', record)
+        APIClient().get('/api/v1/titles/')
+        assert timeouts == [timeout], (
+            'Ответ с реплики должен жить в кеше не дольше окна репликации'
+        )
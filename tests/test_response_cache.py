@@ -0,0 +1,74 @@
+import pytest
+from api.cache import (KEY_PREFIX, bump_version, get_cache, get_stats,
+                       get_version)
+from django.db import transaction
+from django.db.models.deletion import Collector
+from reviews.models import Category, Review
+from users.models import OutboxEmail
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_anonymous_reads_are_cached(
+        self, client, title, django_assert_num_queries
+    ):
+        url = '/api/v1/titles/?year=1990'
+        first = client.get(url)
+        assert first['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный анонимный запрос отдается из кеша'
+        )
+        assert second.json() == first.json()
+        assert client.get('/api/v1/titles/?year=2000')['X-Cache'] == 'MISS', (
+            'Проверьте, что строка запроса входит в ключ кеша'
+        )
+        assert get_stats()['titles'] == {'hits': 1, 'misses': 2}
+
+    def test_signals_invalidate_cache(self, client, title, user):
+        url = f'/api/v1/titles/{title.id}/'
+        client.get(url)
+        Review.objects.create(title=title, author=user, text='!', score=8)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что новый отзыв сбрасывает кеш произведений'
+        )
+        assert response.json()['rating'] == 8
+
+        client.get('/api/v1/categories/')
+        Category.objects.create(name='Книга', slug='book')
+        response = client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 2
+
+    def test_authenticated_reads_bypass_cache(self, user_client, title):
+        user_client.get('/api/v1/titles/')
+        assert 'X-Cache' not in user_client.get('/api/v1/titles/')
+
+    def test_evicted_version_starts_fresh(self, db):
+        first = get_version('titles')
+        bump_version('titles')
+        second = get_version('titles')
+        get_cache().delete(f'{KEY_PREFIX}:titles:version')
+        assert get_version('titles') not in (first, second), (
+            'После вытеснения ключа версия не должна повторять прежние'
+        )
+
+    def test_other_models_keep_fast_delete(self, db):
+        assert Collector('default').can_fast_delete(
+            OutboxEmail.objects.all()
+        ), 'Обработчики кеша не должны отключать быстрое удаление'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCacheCommit:
+
+    def test_version_bumped_after_commit(self, title, user):
+        with transaction.atomic():
+            Review.objects.create(title=title, author=user, text='!', score=8)
+            inside = get_version('titles')
+        assert get_version('titles') != inside, (
+            'Ответ, закешированный до коммита, должен устареть после него'
+        )
@@ -9,3 +9,8 @@ class TestSettings:
         assert settings.DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql', (
             'Проверьте, что используете базу данных postgresql'
         )
+
+    def test_cache_is_shared_between_processes(self):
+        assert 'locmem' not in settings.CACHES['default']['BACKEND'], (
+            'Кеш по умолчанию должен быть общим для воркеров и команд'
+        )
@@ -0,0 +1,169 @@
+import pytest
+from api import serializers
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Title
+
+URL = '/api/v1/titles/batch/'
+
+
+def genre_title_writes(queries):
+    return [
+        query['sql'].split()[0] for query in queries
+        if '"genre_title"' in query['sql']
+        and not query['sql'].startswith('SELECT "reviews_genre"')
+    ]
+
+
+def slugs(title):
+    return sorted(title.genre.values_list('slug', flat=True))
+
+
+@pytest.mark.django_db
+class TestTitleGenreWrites:
+
+    def test_create_inserts_once(self, admin_client, catalog):
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post('/api/v1/titles/', data={
+                'name': 'Новое', 'year': 2000, 'category': 'category-0',
+                'genre': ['genre-0', 'genre-1', 'genre-2'],
+            })
+        assert response.status_code == 201, response.content
+        assert genre_title_writes(queries) == ['INSERT'], (
+            'Жанры нового произведения пишутся одной вставкой'
+        )
+        assert sorted(response.json()['genre']) == [
+            'genre-0', 'genre-1', 'genre-2'
+        ]
+
+    def test_update_writes_diff(self, admin_client, catalog):
+        title = catalog[0]
+        title.genre.set(Title.genre.field.related_model.objects.filter(
+            slug__in=['genre-0', 'genre-1']
+        ))
+        url = f'/api/v1/titles/{title.id}/'
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.patch(
+                url, data={'genre': ['genre-1', 'genre-2']}
+            )
+        assert response.status_code == 200, response.content
+        assert genre_title_writes(queries) == ['SELECT', 'DELETE', 'INSERT']
+        assert slugs(title) == ['genre-1', 'genre-2']
+        with CaptureQueriesContext(connection) as queries:
+            admin_client.patch(url, data={'genre': ['genre-2', 'genre-1']})
+        assert genre_title_writes(queries) == ['SELECT'], (
+            'Неизменные жанры не должны переписываться'
+        )
+
+    def test_read_during_genre_write_is_invalidated(
+        self, admin_client, client, catalog, monkeypatch
+    ):
+        title = catalog[0]
+        url = f'/api/v1/titles/{title.id}/'
+        write_genres = serializers.write_genres
+        stale = {}
+
+        def read_between(*args, **kwargs):
+            response = client.get(url)
+            stale['etag'] = response['ETag']
+            stale['genre'] = response.json()['genre']
+            return write_genres(*args, **kwargs)
+
+        monkeypatch.setattr(serializers, 'write_genres', read_between)
+        response = admin_client.patch(url, data={'genre': ['genre-2']})
+        assert response.status_code == 200, response.content
+        response = client.get(url, HTTP_IF_NONE_MATCH=stale['etag'])
+        assert response.status_code == 200, (
+            'ETag, выданный до записи жанров, должен устареть'
+        )
+        assert response.json()['genre'] != stale['genre']
+        assert [genre['slug'] for genre in response.json()['genre']] == [
+            'genre-2'
+        ], 'Кеш ответов должен сбрасываться после записи жанров'
+
+    def test_failed_genre_write_rolls_back(
+        self, admin_client, catalog, monkeypatch
+    ):
+        def fail(*args, **kwargs):
+            raise IntegrityError('genre_title')
+
+        monkeypatch.setattr(serializers, 'write_genres', fail)
+        with pytest.raises(IntegrityError):
+            admin_client.post('/api/v1/titles/', data={
+                'name': 'Без жанров', 'year': 2000,
+                'category': 'category-0', 'genre': ['genre-0'],
+            })
+        assert not Title.objects.filter(name='Без жанров').exists(), (
+            'Произведение и его жанры пишутся одной транзакцией'
+        )
+
+
+@pytest.mark.django_db
+class TestTitleBatch:
+
+    def test_create_and_update(self, admin_client, client, catalog):
+        assert client.get('/api/v1/titles/').json()['count'] == 12
+        first, second = catalog[:2]
+        response = admin_client.post(URL, data=[
+            {'name': 'Раз', 'year': 2001, 'category': 'category-1',
+             'genre': ['genre-2']},
+            {'id': first.id, 'name': 'Переименовано', 'genre': []},
+            {'name': 'Два', 'year': 2002, 'category': 'category-2',
+             'genre': ['genre-0', 'genre-1'], 'description': 'Текст'},
+            {'id': second.id, 'category': 'category-0'},
+        ], format='json')
+        assert response.status_code == 200, response.content
+        data = response.json()
+        assert data['updated'] == [first.id, second.id]
+        one, two = (Title.objects.get(pk=pk) for pk in data['created'])
+        assert (one.name, one.category.slug, slugs(one)) == (
+            'Раз', 'category-1', ['genre-2']
+        )
+        assert (two.description, slugs(two)) == ('Текст', [
+            'genre-0', 'genre-1'
+        ])
+        first.refresh_from_db()
+        second_genres = slugs(second)
+        second.refresh_from_db()
+        assert first.name == 'Переименовано' and slugs(first) == []
+        assert second.category.slug == 'category-0'
+        assert slugs(second) == second_genres, (
+            'Без поля genre жанры произведения не меняются'
+        )
+        assert client.get('/api/v1/titles/').json()['count'] == 14, (
+            'Проверьте, что пачка сбрасывает кеш списка'
+        )
+
+    def test_all_or_nothing(self, admin_client, catalog):
+        response = admin_client.post(URL, data=[
+            {'name': 'Раз', 'year': 2001, 'category': 'category-1',
+             'genre': ['genre-2']},
+            {'name': 'Без жанра', 'year': 2001, 'category': 'missing',
+             'genre': ['genre-2']},
+            {'id': 0, 'name': 'Нет такого'},
+            'строка',
+        ], format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {} and 'category' in errors[1]
+        assert 'id' in errors[2] and errors[3]
+        assert Title.objects.count() == 12, (
+            'При ошибке в пачке ничего не должно записываться'
+        )
+
+    def test_limits_and_permissions(
+        self, admin_client, user_client, catalog, settings
+    ):
+        item = {'name': 'Раз', 'year': 2001, 'category': 'category-1',
+                'genre': ['genre-2']}
+        assert user_client.post(
+            URL, data=[item], format='json'
+        ).status_code == 403
+        settings.TITLE_BATCH_MAX_SIZE = 2
+        assert admin_client.post(
+            URL, data=[item] * 3, format='json'
+        ).status_code == 400
+        assert admin_client.post(URL, data=[], format='json').status_code == 400
+        assert admin_client.post(
+            URL, data=[item] * 2, format='json'
+        ).status_code == 200
@@ -0,0 +1,75 @@
+import io
+
+import pytest
+from api.views import TitleViewSet
+from django.core.management import call_command
+from reviews.models import Title
+
+URLS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/?ordering=-rating',
+    '/api/v1/titles/?genre=genre-1',
+    '/api/v1/titles/?category=category-2&year=2003',
+    '/api/v1/titles/?name=Произ',
+    '/api/v1/titles/?page=2',
+    '/api/v1/titles/?fields=id,name,rating',
+    '/api/v1/titles/?fields=description,genre,id&expand=category',
+    '/api/v1/titles/?expand=genre',
+)
+
+
+@pytest.mark.django_db
+class TestTitleFastRead:
+
+    def test_parity(self, user_client, catalog, monkeypatch):
+        Title.objects.create(name='Без связей', year=1900, description='Ё')
+        for url in URLS:
+            fast = user_client.get(url)
+            monkeypatch.setattr(TitleViewSet, 'fast_list_enabled', False)
+            slow = user_client.get(url)
+            monkeypatch.setattr(TitleViewSet, 'fast_list_enabled', True)
+            assert fast.status_code == slow.status_code == 200, url
+            assert fast.content == slow.content, (
+                f'Проверьте, что быстрый список {url} совпадает '
+                'с ответом сериализатора'
+            )
+
+    def test_query_count(self, client, catalog, django_assert_num_queries):
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        assert len(response.json()['results']) == 10
+
+    def test_microbenchmark(self):
+        output = io.StringIO()
+        call_command(
+            'benchmark_api', '--title-serialization', '--titles', '20',
+            '--genres', '3', '--categories', '2', '--users', '2',
+            '--reviews-per-title', '1', '--requests', '3', stdout=output
+        )
+        assert 'ответы совпадают: True' in output.getvalue()
+        assert not Title.objects.exists()
+
+    def test_catalog_miss_falls_back_to_database(self, client, catalog):
+        from reviews.models import Category, Genre
+        Genre.objects.bulk_create(
+            [Genre(name='Новый жанр', slug='bulk-genre')]
+        )
+        Category.objects.bulk_create(
+            [Category(name='Новая категория', slug='bulk-category')]
+        )
+        genre = Genre.objects.get(slug='bulk-genre')
+        category = Category.objects.get(slug='bulk-category')
+        Title.objects.filter(pk=catalog[0].pk).update(category=category)
+        catalog[0].genre.through.objects.bulk_create([
+            catalog[0].genre.through(title_id=catalog[0].pk, genre=genre)
+        ])
+        response = client.get('/api/v1/titles/?fields=id,category,genre')
+        assert response.status_code == 200
+        title = next(
+            item for item in response.json()['results']
+            if item['id'] == catalog[0].pk
+        )
+        assert title['category'] == {
+            'name': 'Новая категория', 'slug': 'bulk-category'
+        }, 'Промах справочника должен перечитывать его из базы'
+        assert {'name': 'Новый жанр', 'slug': 'bulk-genre'} in title['genre']
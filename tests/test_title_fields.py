@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestTitleSparseFields:
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200, response.content
+        return response.json(), [query['sql'] for query in queries]
+
+    def test_fields(self, client, catalog):
+        data, queries = self.get(
+            client, '/api/v1/titles/?fields=id,name,rating'
+        )
+        assert list(data['results'][0]) == ['id', 'rating', 'name'], (
+            'Проверьте, что ?fields= оставляет только запрошенные поля'
+        )
+        assert len(queries) == 2, (
+            'Связи без запроса не должны подгружаться'
+        )
+        assert 'description' not in queries[-1]
+        assert 'reviews_category' not in queries[-1]
+
+    def test_expand(self, client, catalog):
+        data, queries = self.get(
+            client, '/api/v1/titles/?fields=name&expand=genre'
+        )
+        title = data['results'][0]
+        assert list(title) == ['genre', 'name']
+        assert set(title['genre'][0]) == {'name', 'slug'}
+        assert len(queries) == 3
+
+        data, _ = self.get(client, '/api/v1/titles/?fields=id,category')
+        assert set(data['results'][0]['category']) == {'name', 'slug'}
+
+    def test_retrieve(self, client, title):
+        data, _ = self.get(
+            client, f'/api/v1/titles/{title.id}/?fields=id,year'
+        )
+        assert data == {'id': title.id, 'year': 1990}
+
+    def test_defaults_and_errors(self, client, title):
+        data, _ = self.get(client, '/api/v1/titles/?expand=genre')
+        assert list(data['results'][0]) == [
+            'id', 'category', 'genre', 'rating', 'name', 'year',
+            'description'
+        ]
+        response = client.get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == 400
+        response = client.get('/api/v1/titles/?fields=id&expand=name')
+        assert response.status_code == 400
@@ -0,0 +1,65 @@
+import pytest
+from reviews.models import Title
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_search_ranks_titles(self, client, title):
+        Title.objects.create(
+            name='Война и мир', year=1869,
+            description='Роман о войне 1812 года'
+        )
+        Title.objects.create(
+            name='Мир', year=1990, description='Про войну здесь ни слова'
+        )
+        Title.objects.create(name='Другое', year=2000)
+        response = client.get('/api/v1/titles/?search=мир')
+        names = [item['name'] for item in response.json()['results']]
+        assert sorted(names) == ['Война и мир', 'Мир'], (
+            'Проверьте, что поиск находит произведения по названию'
+        )
+        assert names[0] == 'Мир', (
+            'Проверьте, что результаты поиска отсортированы по релевантности'
+        )
+
+    def test_search_follows_updates(self, client, title):
+        title.name = 'Новое имя'
+        title.save()
+        response = client.get('/api/v1/titles/?search=новое')
+        assert [item['id'] for item in response.json()['results']] == [
+            title.id
+        ], 'Проверьте, что поисковый индекс обновляется вместе с записью'
+        title.delete()
+        assert client.get('/api/v1/titles/?search=новое').json()[
+            'count'
+        ] == 0
+
+    def test_search_escapes_syntax(self, client, title):
+        response = client.get('/api/v1/titles/?search="чудо" OR *')
+        assert response.status_code == 200
+
+
+@pytest.mark.django_db
+class TestTitleFilters:
+
+    def test_exact_filters(self, client, title):
+        other = Title.objects.create(name='Другое', year=2005)
+        other.genre.set(title.genre.all())
+
+        def ids(query):
+            response = client.get(f'/api/v1/titles/?{query}')
+            return sorted(item['id'] for item in response.json()['results'])
+
+        assert ids('year=1990') == [title.id]
+        assert ids('year=199') == [], (
+            'Проверьте, что год сравнивается точно'
+        )
+        assert ids('year__gte=2000') == [other.id]
+        assert ids('year__lte=2005') == sorted([title.id, other.id])
+        assert ids('category=film') == [title.id]
+        assert ids('category=fil') == [], (
+            'Проверьте, что slug категории сравнивается точно'
+        )
+        assert ids('genre=drama') == sorted([title.id, other.id])
+        assert ids('genre=dram') == []
@@ -0,0 +1,58 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.fixtures.fixture_data import seed_catalog, warm_catalogs
+
+
+@pytest.mark.django_db
+class TestTitleIds:
+
+    def get(self, client, query):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(f'/api/v1/titles/?{query}')
+        return response, len(queries)
+
+    def test_order_and_missing(self, user_client, catalog):
+        ids = [catalog[5].id, catalog[0].id, 0, catalog[3].id, catalog[0].id]
+        response, _ = self.get(
+            user_client, 'ids=' + ','.join(map(str, ids))
+        )
+        assert response.status_code == 200, response.content
+        data = response.json()
+        assert [item['id'] for item in data['results']] == ids[:2] + ids[3:4]
+        assert data['missing'] == [0], (
+            'Проверьте, что ненайденные id перечислены в missing'
+        )
+        detail = user_client.get(f'/api/v1/titles/{catalog[5].id}/')
+        assert data['results'][0] == detail.json(), (
+            'Элемент выборки должен совпадать с ответом по id'
+        )
+
+    def test_fixed_query_count(self, user_client, catalog):
+        seed_catalog(60, prefix='more-')
+        warm_catalogs()
+        few = ','.join(str(title.id) for title in catalog[:3])
+        many = ','.join(str(pk) for pk in range(1, 73))
+        _, few_queries = self.get(user_client, f'ids={few}')
+        response, many_queries = self.get(user_client, f'ids={many}')
+        assert len(response.json()['results']) == 72
+        assert few_queries == many_queries, (
+            'Число запросов не должно зависеть от длины списка'
+        )
+
+    def test_fields_and_limits(self, client, catalog, settings):
+        response, _ = self.get(
+            client, f'ids={catalog[1].id}&fields=name&expand=genre'
+        )
+        assert list(response.json()['results'][0]) == ['genre', 'name']
+        settings.TITLE_IDS_MAX_SIZE = 2
+        for query in (
+            'ids=1,2,3', 'ids=1,2,1', 'ids=1,x', 'ids=1,²', 'ids='
+        ):
+            response, _ = self.get(client, query)
+            assert response.status_code == 400, query
+        pk = catalog[0].id
+        response, _ = self.get(client, f'ids={pk},{pk}')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 1